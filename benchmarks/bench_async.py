@@ -0,0 +1,66 @@
+"""Latency of views that make several I/O-bound upstream calls, written as
+synchronous views and as coroutine views overlapping the calls.
+
+Usage::
+
+    python benchmarks/bench_async.py [requests] [upstream calls] [call latency]
+"""
+import asyncio
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import marshal_with, use_kwargs
+
+
+class BandSchema(ma.Schema):
+    name = ma.fields.Str()
+    albums = ma.fields.List(ma.fields.Str())
+
+
+def make_app(calls, latency):
+    app = flask.Flask(__name__)
+
+    @app.route('/sync/')
+    @use_kwargs({'name': ma.fields.Str()}, location='query')
+    @marshal_with(BandSchema)
+    def sync_view(name):
+        albums = []
+        for idx in range(calls):
+            time.sleep(latency)
+            albums.append('album {}'.format(idx))
+        return {'name': name, 'albums': albums}
+
+    @app.route('/async/')
+    @use_kwargs({'name': ma.fields.Str()}, location='query')
+    @marshal_with(BandSchema)
+    async def async_view(name):
+        async def fetch(idx):
+            await asyncio.sleep(latency)
+            return 'album {}'.format(idx)
+        albums = await asyncio.gather(*(fetch(idx) for idx in range(calls)))
+        return {'name': name, 'albums': albums}
+
+    return app
+
+
+def bench(client, url, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url, query_string={'name': 'queen'})
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    client = make_app(calls, latency).test_client()
+    for label, url in [('sync', '/sync/'), ('async', '/async/')]:
+        print('{:<6} {:>8.1f} ms/request'.format(label, bench(client, url, requests)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Time to fetch a number of marshalled resources with separate requests and
+with one request to the batch endpoint.
+
+Usage::
+
+    python benchmarks/bench_batch.py [size] [repeat]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import FlaskApiSpec, marshal_with
+
+
+class BandSchema(ma.Schema):
+    name = ma.fields.Str()
+    genre = ma.fields.Str()
+
+
+def make_app():
+    app = flask.Flask(__name__)
+    app.config['APISPEC_BATCH_URL'] = '/batch/'
+
+    @app.route('/bands/<name>/')
+    @marshal_with(BandSchema)
+    def get_band(name):
+        return {'name': name, 'genre': 'rock'}
+
+    FlaskApiSpec(app)
+    return app
+
+
+def bench(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    client = make_app().test_client()
+    paths = ['/bands/{}/'.format(idx) for idx in range(size)]
+    batch = [{'path': path} for path in paths]
+
+    def separate():
+        for path in paths:
+            client.get(path)
+
+    elapsed = bench(separate, repeat)
+    print('{} requests  {:>7.2f} ms'.format(size, elapsed))
+    elapsed = bench(lambda: client.post('/batch/', json=batch), repeat)
+    print('1 batch      {:>7.2f} ms'.format(elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Throughput of a marshalled list view with and without `cache_response`.
+
+Usage::
+
+    python benchmarks/bench_cache.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import cache_response, marshal_with, use_kwargs
+
+
+class AlbumSchema(ma.Schema):
+    title = ma.fields.Str()
+    year = ma.fields.Int()
+    tags = ma.fields.List(ma.fields.Str())
+
+
+ALBUMS = [
+    {'title': 'album {}'.format(idx), 'year': 1970 + idx % 50, 'tags': ['rock']}
+    for idx in range(200)
+]
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    for name, decorate in [('plain', lambda func: func), ('cached', cache_response())]:
+        def view(**kwargs):
+            return ALBUMS[:kwargs.get('limit', 200)]
+
+        func = decorate(
+            use_kwargs({'limit': ma.fields.Int()}, location='query')(
+                marshal_with(AlbumSchema(many=True))(view)))
+        app.add_url_rule('/' + name, name, func)
+    return app
+
+
+def bench(client, path, requests):
+    client.get(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client = make_app().test_client()
+    for name in ['plain', 'cached']:
+        rate = bench(client, '/{}?limit=100'.format(name), requests)
+        print('{:<7} {:>8.0f} req/s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    main()
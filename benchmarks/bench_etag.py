@@ -0,0 +1,67 @@
+"""Throughput of polling a marshalled list view with `If-None-Match`, with a
+checksum ETag and with a version token, compared with a plain view.
+
+Usage::
+
+    python benchmarks/bench_etag.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import conditional_response, marshal_with
+
+
+class AlbumSchema(ma.Schema):
+    title = ma.fields.Str()
+    year = ma.fields.Int()
+    tags = ma.fields.List(ma.fields.Str())
+
+
+class Albums(list):
+    revision = 42
+
+
+ALBUMS = Albums(
+    {'title': 'album {}'.format(idx), 'year': 1970 + idx % 50, 'tags': ['rock']}
+    for idx in range(200)
+)
+
+
+def make_app():
+    app = flask.Flask(__name__)
+    for name, decorate in [
+        ('plain', lambda func: func),
+        ('checksum', conditional_response()),
+        ('version', conditional_response(version=lambda albums: albums.revision)),
+    ]:
+        def view():
+            return ALBUMS
+
+        app.add_url_rule('/' + name, name, decorate(
+            marshal_with(AlbumSchema(many=True))(view)))
+    return app
+
+
+def bench(client, path, requests):
+    etag = client.get(path).headers.get('ETag', '"none"')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers={'If-None-Match': etag})
+    elapsed = time.perf_counter() - start
+    status = client.get(path, headers={'If-None-Match': etag}).status_code
+    return requests / elapsed, status
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    client = make_app().test_client()
+    for name in ['plain', 'checksum', 'version']:
+        rate, status = bench(client, '/' + name, requests)
+        print('{:<9} {:>8.0f} req/s ({})'.format(name, rate, status))
+
+
+if __name__ == '__main__':
+    main()
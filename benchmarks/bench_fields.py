@@ -0,0 +1,58 @@
+"""Per-request cost of marshalling a list of objects with a wide schema, in
+full and with a sparse fieldset selected by the client.
+
+Usage::
+
+    python benchmarks/bench_fields.py [fields] [items] [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import marshal_with, sparse_fields
+
+
+def make_app(width, items):
+    app = flask.Flask(__name__)
+    schema_cls = ma.Schema.from_dict({
+        'field_{}'.format(idx): ma.fields.Str() for idx in range(width)
+    })
+    data = [
+        {'field_{}'.format(idx): 'value' for idx in range(width)}
+        for _ in range(items)
+    ]
+
+    @sparse_fields()
+    @marshal_with(schema_cls(many=True))
+    def view():
+        return data
+
+    app.add_url_rule('/', 'view', view)
+    return app
+
+
+def bench(app, query, requests):
+    view = app.view_functions['view']
+    with app.test_request_context('/', query_string=query):
+        view()
+        start = time.perf_counter()
+        for _ in range(requests):
+            view()
+        return (time.perf_counter() - start) / requests * 1e3
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    app = make_app(width, items)
+    full = bench(app, {}, requests)
+    sparse = bench(app, {'fields': 'field_0,field_1,field_2'}, requests)
+    print('all fields  {:>8.3f} ms/request'.format(full))
+    print('3 fields    {:>8.3f} ms/request'.format(sparse))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Time to create a deep `MethodResource` hierarchy in which every level
+adds class decorators and decorated methods.
+
+Usage::
+
+    python benchmarks/bench_inherit.py [depth] [repeat]
+"""
+import sys
+import time
+
+import marshmallow as ma
+
+from flask_apispec import MethodResource, doc, marshal_with, use_kwargs
+
+METHODS = ['get', 'post', 'put', 'patch', 'delete']
+
+
+def make_hierarchy(depth):
+    base = MethodResource
+    for level in range(depth):
+        attrs = {}
+        for method in METHODS:
+            def view(self, **kwargs):
+                return kwargs
+            view = doc(description='{} {}'.format(method, level))(view)
+            view = use_kwargs({'field_{}'.format(level): ma.fields.Str()})(view)
+            view = marshal_with(None, code=200 + level)(view)
+            attrs[method] = view
+        base = doc(tags=['level {}'.format(level)])(
+            marshal_with(None, code=400 + level)(
+                type(base)('Level{}'.format(level), (base, ), attrs)))
+    return base
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    start = time.perf_counter()
+    for _ in range(repeat):
+        make_hierarchy(depth)
+    elapsed = (time.perf_counter() - start) / repeat
+    print('{} levels: {:.1f} ms/hierarchy'.format(depth, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Throughput of marshalled responses for each `APISPEC_JSON_ENCODER`
+backend, for small and large payloads.
+
+Usage::
+
+    python benchmarks/bench_json.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import doc
+from flask_apispec.encoders import AUTO_BACKENDS
+
+
+class AlbumSchema(ma.Schema):
+    title = ma.fields.Str()
+    year = ma.fields.Int()
+    rating = ma.fields.Float()
+    tags = ma.fields.List(ma.fields.Str())
+
+
+ALBUM = {'title': 'a night at the opera', 'year': 1975, 'rating': 4.5,
+         'tags': ['rock', 'opera']}
+
+
+def make_app(backend, items):
+    app = flask.Flask(__name__)
+    app.config['APISPEC_JSON_ENCODER'] = backend
+
+    # Dump once up front to measure encoding rather than marshmallow
+    @doc(description='albums')
+    def view():
+        return data
+
+    data = AlbumSchema(many=True).dump([ALBUM] * items) if items > 1 else ALBUM
+    app.add_url_rule('/', view_func=view)
+    return app
+
+
+def bench(app, requests):
+    view = app.view_functions['view']
+    with app.test_request_context('/'):
+        view()
+        start = time.perf_counter()
+        for _ in range(requests):
+            view()
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for label, items in [('small', 1), ('large', 5000)]:
+        count = requests * 10 if items == 1 else requests // 20
+        for backend in (None, ) + AUTO_BACKENDS:
+            try:
+                rate = bench(make_app(backend, items), count)
+            except ImportError:
+                continue
+            print('{:<6} {:<9} {:>10.0f} req/s'.format(label, backend or 'jsonify', rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Time spent merging annotation options for deep `doc` stacks and wide
+`marshal_with` code maps.
+
+Usage::
+
+    python benchmarks/bench_merge.py [repeat]
+"""
+import sys
+import timeit
+
+import marshmallow as ma
+
+from flask_apispec import doc, marshal_with, utils
+from flask_apispec.utils import merge_recursive, resolve_annotations
+
+
+class BandSchema(ma.Schema):
+    name = ma.fields.Str()
+
+
+def make_view(depth, codes):
+    def view():
+        pass
+    for idx in range(depth):
+        view = doc(
+            tags=['tag {}'.format(idx)],
+            params={'param_{}'.format(idx): {'description': 'param', 'in': 'query'}},
+            responses={str(400 + idx): {'description': 'error {}'.format(idx)}},
+        )(view)
+    for code in range(codes):
+        view = marshal_with(BandSchema, code=200 + code, description='band')(view)
+    return view
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    view = make_view(depth=50, codes=50)
+    docs = resolve_annotations(view, 'docs').options
+    schemas = resolve_annotations(view, 'schemas').options
+
+    def cold(options):
+        utils._merge_cache.clear()
+        merge_recursive(options)
+
+    for label, options in [('50 @doc', docs), ('50 codes', schemas)]:
+        elapsed = timeit.timeit(lambda: cold(options), number=repeat)
+        print('{:<9} {:>8.2f} us/merge'.format(label, elapsed / repeat * 1e6))
+        elapsed = timeit.timeit(lambda: merge_recursive(options), number=repeat)
+        print('{:<9} {:>8.2f} us/merge (memoized)'.format(label, elapsed / repeat * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Per-request overhead of a decorated view that neither parses nor marshals,
+compared with a bare Flask view returning the same data.
+
+Usage::
+
+    python benchmarks/bench_overhead.py [requests]
+"""
+import sys
+import time
+
+import flask
+
+from flask_apispec import MethodResource, doc
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    @app.route('/bare/')
+    def bare():
+        return flask.jsonify({'name': 'queen'})
+
+    @app.route('/decorated/')
+    @doc(description='a band')
+    def decorated():
+        return {'name': 'queen'}
+
+    class BandResource(MethodResource):
+        @doc(description='a band')
+        def get(self):
+            return {'name': 'queen'}
+
+    app.add_url_rule('/resource/', view_func=BandResource.as_view('resource'))
+    return app
+
+
+def bench(app, endpoint, requests):
+    view = app.view_functions[endpoint]
+    with app.test_request_context('/'):
+        view()
+        start = time.perf_counter()
+        for _ in range(requests):
+            view()
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = make_app()
+    bare = bench(app, 'bare', requests)
+    print('{:<10} {:>8.2f} us/request'.format('bare', bare))
+    for endpoint in ['decorated', 'resource']:
+        elapsed = bench(app, endpoint, requests)
+        print('{:<10} {:>8.2f} us/request ({:+.2f} us)'.format(
+            endpoint, elapsed, elapsed - bare))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Per-request cost of a list endpoint over a large result, marshalled whole
+and with `paginate`.
+
+Usage::
+
+    python benchmarks/bench_paginate.py [rows] [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import marshal_with, paginate
+
+
+class RowSchema(ma.Schema):
+    id = ma.fields.Int()
+    name = ma.fields.Str()
+
+
+def make_app(rows):
+    app = flask.Flask(__name__)
+    data = [{'id': idx, 'name': 'row {}'.format(idx)} for idx in range(rows)]
+
+    @marshal_with(RowSchema(many=True))
+    def whole():
+        return data
+
+    @paginate(limit=50)
+    @marshal_with(RowSchema(many=True))
+    def paged():
+        return data
+
+    app.add_url_rule('/whole', 'whole', whole)
+    app.add_url_rule('/paged', 'paged', paged)
+    return app
+
+
+def bench(app, endpoint, requests):
+    view = app.view_functions[endpoint]
+    with app.test_request_context('/' + endpoint):
+        size = len(view().get_data())
+        start = time.perf_counter()
+        for _ in range(requests):
+            view()
+        return (time.perf_counter() - start) / requests * 1e3, size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = make_app(rows)
+    for endpoint in ['whole', 'paged']:
+        elapsed, size = bench(app, endpoint, requests)
+        print('{:<6} {:>9.3f} ms/request {:>9} bytes'.format(endpoint, elapsed, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Per-request cost of parsing a view that reads arguments from several
+locations, when the request only fills some of them.
+
+Usage::
+
+    python benchmarks/bench_parse.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import use_kwargs
+
+
+class QuerySchema(ma.Schema):
+    page = ma.fields.Int()
+    per_page = ma.fields.Int()
+
+
+class BodySchema(ma.Schema):
+    name = ma.fields.Str()
+    genre = ma.fields.Str()
+
+
+class CookieSchema(ma.Schema):
+    session = ma.fields.Str()
+
+
+class FormSchema(ma.Schema):
+    comment = ma.fields.Str()
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    @app.route('/bands/<int:band_id>/', methods=['GET', 'POST'])
+    @use_kwargs(QuerySchema, location='query')
+    @use_kwargs(BodySchema, location='json')
+    @use_kwargs(CookieSchema, location='cookies')
+    @use_kwargs(FormSchema, location='form')
+    def view(**kwargs):
+        return kwargs
+
+    return app
+
+
+REQUESTS = [
+    ('empty', {}),
+    ('query', {'query_string': {'page': 2}}),
+    ('json', {'method': 'POST', 'json': {'name': 'queen'}}),
+]
+
+
+def bench(app, requests, **options):
+    view = app.view_functions['view']
+    with app.test_request_context('/bands/1/', **options):
+        flask.request.view_args = {'band_id': 1}
+        view(band_id=1)
+        start = time.perf_counter()
+        for _ in range(requests):
+            view(band_id=1)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = make_app()
+    for label, options in REQUESTS:
+        elapsed = bench(app, requests, **options)
+        print('{:<6} {:>8.2f} us/request'.format(label, elapsed))
+
+
+if __name__ == '__main__':
+    main()
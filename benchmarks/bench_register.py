@@ -0,0 +1,53 @@
+"""Time to register many resources whose rules have typed path arguments.
+
+Usage::
+
+    python benchmarks/bench_register.py [resources] [repeat]
+"""
+import sys
+import time
+
+import flask
+
+from flask_apispec import MethodResource
+from flask_apispec.extension import FlaskApiSpec
+
+
+class BandResource(MethodResource):
+    def get(self, **kwargs):
+        return kwargs
+
+    def put(self, **kwargs):
+        return kwargs
+
+    def patch(self, **kwargs):
+        return kwargs
+
+    def delete(self, **kwargs):
+        return kwargs
+
+
+def bench(resources):
+    app = flask.Flask(__name__)
+    docs = FlaskApiSpec(app)
+    for idx in range(resources):
+        app.add_url_rule(
+            '/bands/{}/<int:band_id>/albums/<album_id>/<float:rating>/'.format(idx),
+            view_func=BandResource.as_view('band_{}'.format(idx)),
+        )
+    start = time.perf_counter()
+    for idx in range(resources):
+        docs.register(BandResource, endpoint='band_{}'.format(idx))
+    return time.perf_counter() - start
+
+
+def main():
+    resources = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    elapsed = min(bench(resources) for _ in range(repeat))
+    print('{} resources: {:.1f} ms ({:.1f} us/resource)'.format(
+        resources, elapsed * 1e3, elapsed / resources * 1e6))
+
+
+if __name__ == '__main__':
+    main()
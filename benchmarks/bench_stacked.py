@@ -0,0 +1,48 @@
+"""Per-request cost of parsing a view with several `use_kwargs` dicts for the
+same location, as produced by stacking decorators or inheriting them.
+
+Usage::
+
+    python benchmarks/bench_stacked.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import use_kwargs
+
+
+def make_app(stacked):
+    app = flask.Flask(__name__)
+
+    def view(**kwargs):
+        return kwargs
+
+    for idx in range(stacked):
+        view = use_kwargs({'arg_{}'.format(idx): ma.fields.Int()}, location='query')(view)
+    app.add_url_rule('/', 'view', view)
+    return app
+
+
+def bench(app, stacked, requests):
+    view = app.view_functions['view']
+    query = {'arg_{}'.format(idx): idx for idx in range(stacked)}
+    with app.test_request_context('/', query_string=query):
+        assert len(view().get_json()) == stacked
+        start = time.perf_counter()
+        for _ in range(requests):
+            view()
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for stacked in [1, 2, 4, 8]:
+        elapsed = bench(make_app(stacked), stacked, requests)
+        print('{} dicts {:>8.2f} us/request'.format(stacked, elapsed))
+
+
+if __name__ == '__main__':
+    main()
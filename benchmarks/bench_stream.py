@@ -0,0 +1,70 @@
+"""Peak memory of marshalling large list responses with and without
+``marshal_with(..., stream=True)``.
+
+Usage::
+
+    python benchmarks/bench_stream.py [rows ...]
+"""
+import sys
+import time
+import tracemalloc
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import marshal_with
+
+
+class BandSchema(ma.Schema):
+    id = ma.fields.Int()
+    name = ma.fields.Str()
+    genre = ma.fields.Str()
+
+
+class Band:
+    def __init__(self, id):
+        self.id = id
+        self.name = 'band {}'.format(id)
+        self.genre = 'rock'
+
+
+def make_app(rows):
+    app = flask.Flask(__name__)
+
+    @app.route('/buffered/')
+    @marshal_with(BandSchema(many=True))
+    def buffered():
+        return (Band(idx) for idx in range(rows))
+
+    @app.route('/streamed/')
+    @marshal_with(BandSchema(many=True), stream=True)
+    def streamed():
+        return (Band(idx) for idx in range(rows))
+
+    return app
+
+
+def bench(client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed, size
+
+
+def main():
+    counts = [int(each) for each in sys.argv[1:]] or [10000, 100000, 1000000]
+    for rows in counts:
+        client = make_app(rows).test_client()
+        for label in ['buffered', 'streamed']:
+            peak, elapsed, size = bench(client, '/{}/'.format(label))
+            print('{:>8} rows {:<9} peak {:>8.1f} MiB  {:>6.2f}s  {:>10} bytes'.format(
+                rows, label, peak, elapsed, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Throughput of the swagger JSON endpoint for a spec with many paths.
+
+Usage::
+
+    python benchmarks/bench_swagger.py [paths] [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import FlaskApiSpec, doc, marshal_with, use_kwargs
+
+
+class BandSchema(ma.Schema):
+    name = ma.fields.Str()
+    genre = ma.fields.Str()
+    formed = ma.fields.Int()
+
+
+def make_app(paths):
+    app = flask.Flask(__name__)
+    docs = FlaskApiSpec(app)
+
+    for idx in range(paths):
+        @doc(tags=['band'], description='band {}'.format(idx))
+        @use_kwargs({'name': ma.fields.Str(), 'genre': ma.fields.Str()}, location='query')
+        @marshal_with(BandSchema)
+        def view(band_id, **kwargs):
+            return {}
+        view.__name__ = 'band_{}'.format(idx)
+        app.add_url_rule('/bands/{}/<int:band_id>/'.format(idx), view_func=view)
+        docs.register(view)
+    return app, docs
+
+
+def bench(client, requests, setup=lambda: None, **kwargs):
+    start = time.perf_counter()
+    for _ in range(requests):
+        setup()
+        client.get('/swagger/', **kwargs)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    app, docs = make_app(paths)
+    client = app.test_client()
+    etag = client.get('/swagger/').headers['ETag']
+    results = [
+        ('uncached', bench(client, requests, setup=docs._swagger_cache.clear)),
+        ('cached', bench(client, requests)),
+        ('304', bench(client, requests, headers={'If-None-Match': etag})),
+    ]
+    for label, rate in results:
+        print('{:<10} {:>10.0f} req/s'.format(label, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Request throughput of a view with stacked `use_kwargs`/`marshal_with`
+decorators.
+
+Usage::
+
+    python benchmarks/bench_views.py [requests]
+"""
+import sys
+import time
+
+import flask
+import marshmallow as ma
+
+from flask_apispec import MethodResource, marshal_with, use_kwargs
+
+
+class BandSchema(ma.Schema):
+    name = ma.fields.Str()
+    genre = ma.fields.Str()
+    formed = ma.fields.Int()
+
+
+class Band:
+    def __init__(self, name='queen', genre='rock', formed=1970, **kwargs):
+        self.name = name
+        self.genre = genre
+        self.formed = formed
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    @app.route('/bands/<band_id>/')
+    @use_kwargs({'name': ma.fields.Str()}, location='query')
+    @use_kwargs({'genre': ma.fields.Str()}, location='query')
+    @use_kwargs({'formed': ma.fields.Int()}, location='query')
+    @marshal_with(BandSchema)
+    @marshal_with(BandSchema(only=('name', )), code=201)
+    def get_band(band_id, **kwargs):
+        return Band(**kwargs)
+
+    @use_kwargs({'name': ma.fields.Str()}, location='query')
+    @marshal_with(BandSchema)
+    class BandResource(MethodResource):
+        @use_kwargs({'genre': ma.fields.Str()}, location='query')
+        @marshal_with(BandSchema(only=('name', )), code=201)
+        def get(self, band_id, **kwargs):
+            return Band(**kwargs)
+
+    app.add_url_rule('/resources/<band_id>/', view_func=BandResource.as_view('band'))
+    return app
+
+
+def bench(app, url, requests):
+    path = url + '?name=queen&genre=rock&formed=1970'
+    view = app.view_functions[app.url_map.bind('').match(url)[0]]
+    with app.test_request_context(path):
+        flask.request.view_args = {'band_id': '1'}
+        view(band_id='1')
+        start = time.perf_counter()
+        for _ in range(requests):
+            view(band_id='1')
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = make_app()
+    for label, url in [('function view', '/bands/1/'), ('method resource', '/resources/1/')]:
+        print('{:<16} {:>10.0f} req/s'.format(label, bench(app, url, requests)))
+
+
+if __name__ == '__main__':
+    main()
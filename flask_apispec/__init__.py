@@ -1,4 +1,7 @@
-from flask_apispec.annotations import doc, marshal_with, use_kwargs, wrap_with
+from flask_apispec.annotations import (
+    cache_response, conditional_response, doc, marshal_with, paginate, sparse_fields,
+    use_kwargs, wrap_with,
+)
 from flask_apispec.extension import FlaskApiSpec
 from flask_apispec.utils import Ref
 from flask_apispec.views import MethodResource, ResourceMeta
@@ -9,6 +12,10 @@ __all__ = [
     'wrap_with',
     'use_kwargs',
     'marshal_with',
+    'cache_response',
+    'conditional_response',
+    'paginate',
+    'sparse_fields',
     'ResourceMeta',
     'MethodResource',
     'FlaskApiSpec',
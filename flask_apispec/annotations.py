@@ -1,7 +1,8 @@
 import functools
+import inspect
 
-from flask_apispec import utils
-from flask_apispec.wrapper import Wrapper
+from flask_apispec import fieldsets, pagination, parsing, utils
+from flask_apispec.wrapper import get_wrapper
 
 
 def use_kwargs(args, location=None, inherit=None, apply=None, **kwargs):
@@ -27,6 +28,9 @@ def use_kwargs(args, location=None, inherit=None, apply=None, **kwargs):
     """
 
     kwargs.update({'location': location})
+    if isinstance(args, dict):
+        # Generate the schema class used to parse and document `args` once
+        parsing.schema_from_dict(args)
 
     def wrapper(func):
         options = {
@@ -38,7 +42,8 @@ def use_kwargs(args, location=None, inherit=None, apply=None, **kwargs):
     return wrapper
 
 
-def marshal_with(schema, code='default', description='', inherit=None, apply=None):
+def marshal_with(schema, code='default', description='', inherit=None, apply=None,
+                 stream=False):
     """Marshal the return value of the decorated view function using the
     specified schema.
 
@@ -59,6 +64,8 @@ def marshal_with(schema, code='default', description='', inherit=None, apply=Non
     :param description: Optional response description
     :param inherit: Inherit schemas from parent classes
     :param apply: Marshal response with specified schema
+    :param stream: Dump an iterable returned by the view in chunks and stream
+        it as a JSON array, or as newline-delimited JSON if ``'ndjson'``
     """
     def wrapper(func):
         options = {
@@ -67,6 +74,8 @@ def marshal_with(schema, code='default', description='', inherit=None, apply=Non
                 'description': description,
             },
         }
+        if stream:
+            options[code]['stream'] = stream
         annotate(func, 'schemas', [options], inherit=inherit, apply=apply)
         return activate(func)
     return wrapper
@@ -92,8 +101,143 @@ def doc(inherit=None, **kwargs):
     return wrapper
 
 
+def cache_response(ttl=60, key=None, inherit=None):
+    """Cache the encoded response of the decorated view function for each
+    combination of parsed arguments, and answer matching `If-None-Match`
+    requests with 304 Not Modified. Only successful GET and HEAD requests are
+    cached, in the backend set by `APISPEC_CACHE`.
+
+    Usage:
+
+    .. code-block:: python
+
+        @cache_response(ttl=300)
+        @use_kwargs({'category': fields.Str()}, location='query')
+        @marshal_with(PetSchema(many=True))
+        def list_pets(**kwargs):
+            return Pet.query.filter_by(**kwargs).all()
+
+    :param ttl: Seconds to keep responses for, or `None` to keep them until
+        they are evicted
+    :param key: Optional callable that receives the arguments of the view and
+        returns a string identifying its response, instead of all of them
+    :param inherit: Inherit caching options from parent classes
+    """
+    def wrapper(func):
+        annotate(func, 'cache', [{'ttl': ttl, 'key': key}], inherit=inherit)
+        annotate(func, 'docs', [{
+            'x-cache-ttl': ttl,
+            'responses': {'304': {'description': 'Not modified'}},
+        }], inherit=inherit)
+        return activate(func)
+    return wrapper
+
+
+def conditional_response(version=None, inherit=None):
+    """Set an ETag on successful responses of the decorated view function and
+    answer matching `If-None-Match` requests with an empty 304 Not Modified.
+
+    By default the ETag is a checksum of the encoded response. Pass `version`
+    to derive it from the object returned by the view instead, e.g. from a
+    revision number, so that 304 responses skip marshalling entirely.
+
+    Usage:
+
+    .. code-block:: python
+
+        @conditional_response(version=lambda pet: pet.revision)
+        @marshal_with(PetSchema)
+        def get_pet(pet_id):
+            return Pet.query.filter(Pet.id == pet_id).one()
+
+    :param version: Optional callable that receives the return value of the
+        view and returns its version, or `None` to use a checksum
+    :param inherit: Inherit ETag options from parent classes
+    """
+    def wrapper(func):
+        annotate(func, 'etag', [{'version': version}], inherit=inherit)
+        annotate(func, 'docs', [{
+            'responses': {'304': {'description': 'Not modified'}},
+        }], inherit=inherit)
+        return activate(func)
+    return wrapper
+
+
+def paginate(limit=20, max_limit=100, envelope='items', next_key='next',
+             cursor_arg='cursor', limit_arg='limit', inherit=None):
+    """Return the result of the decorated view function one page at a time.
+
+    The view returns all of its results, e.g. as a SQLAlchemy query or any
+    iterable, and only the page requested with the `cursor_arg` and
+    `limit_arg` query arguments is loaded and marshalled. Successful
+    responses wrap the items in an envelope with the cursor of the next page,
+    and link to the next page in a ``Link`` header.
+
+    Usage:
+
+    .. code-block:: python
+
+        @paginate(limit=50, max_limit=500)
+        @marshal_with(PetSchema(many=True))
+        def list_pets():
+            return Pet.query.order_by(Pet.id)
+
+    :param limit: Number of items per page when the request sets no limit
+    :param max_limit: Maximum number of items per page
+    :param envelope: Key of the items in the response, or `None` to respond
+        with the items only
+    :param next_key: Key of the cursor of the next page in the response
+    :param cursor_arg: Name of the query argument of the cursor
+    :param limit_arg: Name of the query argument of the limit
+    :param inherit: Inherit pagination options from parent classes
+    """
+    options = {
+        'schema': pagination.make_schema(limit, max_limit, cursor_arg, limit_arg),
+        'envelope': envelope,
+        'next_key': next_key,
+        'cursor_arg': cursor_arg,
+        'limit_arg': limit_arg,
+    }
+
+    def wrapper(func):
+        annotate(func, 'paginate', [options], inherit=inherit)
+        return activate(func)
+    return wrapper
+
+
+def sparse_fields(arg='fields', inherit=None):
+    """Let clients select the fields of successful responses of the decorated
+    view function with the `arg` query argument, e.g. ``?fields=name,genre``.
+
+    Results are dumped with an instance of the response schema restricted to
+    the selected fields with ``only``, so other fields are never computed.
+    Fields of nested schemas are selected with dots, e.g. ``owner.name``.
+    Selecting fields that the response schema does not dump is a validation
+    error.
+
+    Usage:
+
+    .. code-block:: python
+
+        @sparse_fields()
+        @marshal_with(PetSchema(many=True))
+        def list_pets():
+            return Pet.query.all()
+
+    :param arg: Name of the query argument
+    :param inherit: Inherit sparse fieldset options from parent classes
+    """
+    options = {'arg': arg, 'schema': fieldsets.make_schema(arg)}
+
+    def wrapper(func):
+        annotate(func, 'fields', [options], inherit=inherit)
+        return activate(func)
+    return wrapper
+
+
 def wrap_with(wrapper_cls):
     """Use a custom `Wrapper` to apply annotations to the decorated function.
+    Coroutine view functions must use a subclass of `AsyncWrapper`.
 
     :param wrapper_cls: Custom `Wrapper` subclass
     """
@@ -107,19 +251,23 @@ def annotate(func, key, options, **kwargs):
     annotation = utils.Annotation(options, **kwargs)
     func.__apispec__ = func.__dict__.get('__apispec__', {})
     func.__apispec__.setdefault(key, []).insert(0, annotation)
+    utils.touch()
 
 
 def activate(func):
     if isinstance(func, type) or getattr(func, '__apispec__', {}).get('wrapped'):
         return func
 
-    @functools.wraps(func)
-    def wrapped(*args, **kwargs):
-        instance = args[0] if func.__apispec__.get('ismethod') else None
-        annotation = utils.resolve_annotations(func, 'wrapper', instance)
-        wrapper_cls = utils.merge_recursive(annotation.options).get('wrapper', Wrapper)
-        wrapper = wrapper_cls(func, instance)
-        return wrapper(*args, **kwargs)
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapped(*args, **kwargs):
+            instance = args[0] if func.__apispec__.get('ismethod') else None
+            return await get_wrapper(func, instance)(*args, **kwargs)
+    else:
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            instance = args[0] if func.__apispec__.get('ismethod') else None
+            return get_wrapper(func, instance)(*args, **kwargs)
 
     wrapped.__apispec__['wrapped'] = True
     return wrapped
@@ -6,17 +6,20 @@ from apispec.ext.marshmallow import MarshmallowPlugin
 
 from marshmallow import Schema
 
-from flask_apispec.paths import rule_to_path, rule_to_params
+from flask_apispec.pagination import envelope_schema
+from flask_apispec.parsing import schema_from_dict
+from flask_apispec.paths import RouteIndex
 from flask_apispec.utils import (
     is_instance_or_subclass, resolve_resource, resolve_annotations, merge_recursive
 )
 
 
 class Converter:
-    def __init__(self, app, spec, document_options=True):
+    def __init__(self, app, spec, document_options=True, routes=None):
         self.app = app
         self.spec = spec
         self.document_options = document_options
+        self.routes = routes or RouteIndex(app.url_map)
         try:
             self.marshmallow_plugin = next(
                 plugin for plugin in self.spec.plugins
@@ -32,7 +35,7 @@ class Converter:
         endpoint = endpoint or target.__name__.lower()
         if blueprint:
             endpoint = '{}.{}'.format(blueprint, endpoint)
-        rules = self.app.url_map._rules_by_endpoint[endpoint]
+        rules = self.routes.rules(endpoint)
         return [self.get_path(rule, target, **kwargs) for rule in rules]
 
     def get_path(self, rule, target, **kwargs):
@@ -44,7 +47,7 @@ class Converter:
             excluded_methods.add('options')
         return {
             'view': target,
-            'path': rule_to_path(rule),
+            'path': self.routes.path(rule),
             'operations': {
                 method.lower(): self.get_operation(rule, view, parent=parent)
                 for method, view in operations.items()
@@ -62,7 +65,7 @@ class Converter:
             'responses': self.get_responses(view, parent),
             'parameters': self.get_parameters(rule, view, docs, parent),
         }
-        docs.pop('params', None)
+        docs = {key: value for key, value in docs.items() if key != 'params'}
         return merge_recursive([operation, docs])
 
     def get_parent(self, view):
@@ -79,7 +82,7 @@ class Converter:
                 if callable(schema):
                     schema = schema(request=None)
                 else:
-                    schema = Schema.from_dict(schema)
+                    schema = schema_from_dict(schema)
                     openapi_converter = functools.partial(
                         self._convert_dict_schema, openapi_converter)
 
@@ -88,13 +91,33 @@ class Converter:
                 options['location'] = 'body'
             extra_params += openapi_converter(schema, **options) if args else []
 
-        rule_params = rule_to_params(rule, docs.get('params')) or []
+        page = merge_recursive(resolve_annotations(view, 'paginate', parent).options)
+        if page:
+            extra_params += openapi.schema2parameters(page['schema'], location='query')
+        fields = merge_recursive(resolve_annotations(view, 'fields', parent).options)
+        if fields:
+            for param in openapi.schema2parameters(fields['schema'], location='query'):
+                # The fields are comma-separated rather than repeated
+                if self.spec.openapi_version.major < 3:
+                    param['collectionFormat'] = 'csv'
+                else:
+                    param['explode'] = False
+                extra_params.append(param)
+
+        rule_params = self.routes.params(rule, docs.get('params'))
 
         return extra_params + rule_params
 
     def get_responses(self, view, parent=None):
         annotation = resolve_annotations(view, 'schemas', parent)
-        return merge_recursive(annotation.options)
+        page = merge_recursive(resolve_annotations(view, 'paginate', parent).options)
+        responses = {}
+        for code, response in merge_recursive(annotation.options).items():
+            response = {key: value for key, value in response.items() if key != 'stream'}
+            if page and code in (200, '200', 'default') and 'schema' in response:
+                response['schema'] = envelope_schema(response['schema'], page)
+            responses[code] = response
+        return responses
 
     def _convert_dict_schema(self, openapi_converter, schema, location, **options):
         """When location is 'body' and OpenApi is 2, return one param for body fields.
@@ -0,0 +1,117 @@
+"""Batch endpoint that serves many sub-requests in one HTTP call, registered
+by `FlaskApiSpec` when `APISPEC_BATCH_URL` is set.
+"""
+import concurrent.futures
+
+import flask
+import marshmallow as ma
+from werkzeug.datastructures import Headers
+from werkzeug.test import EnvironBuilder
+
+from flask_apispec.annotations import doc, marshal_with, use_kwargs
+
+# Sub-requests that may run concurrently when `APISPEC_BATCH_WORKERS` > 1
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# Marks the WSGI environment of sub-requests
+BATCH_ENVIRON_KEY = 'flask_apispec.batch'
+
+# Headers of the batch request that do not apply to its sub-requests
+SKIPPED_HEADERS = {'content-type', 'content-length'}
+
+
+class BatchRequestSchema(ma.Schema):
+    method = ma.fields.Str(load_default='GET', metadata={
+        'description': 'HTTP method',
+    })
+    path = ma.fields.Str(required=True, metadata={
+        'description': 'Path of the sub-request, relative to the application root',
+    })
+    query = ma.fields.Dict(keys=ma.fields.Str(), load_default=None, metadata={
+        'description': 'Query string arguments',
+    })
+    body = ma.fields.Raw(load_default=None, metadata={
+        'description': 'JSON body',
+    })
+    headers = ma.fields.Dict(
+        keys=ma.fields.Str(), values=ma.fields.Str(), load_default=None,
+        metadata={'description': 'Headers, added to those of the batch request'},
+    )
+
+
+class BatchResponseSchema(ma.Schema):
+    status = ma.fields.Int()
+    headers = ma.fields.Dict(keys=ma.fields.Str(), values=ma.fields.Str())
+    body = ma.fields.Raw()
+
+
+@doc(
+    tags=['batch'],
+    summary='Run a batch of requests',
+    description=(
+        'Dispatch each sub-request in the application and return their '
+        'responses in the same order.'
+    ),
+)
+@use_kwargs(BatchRequestSchema(many=True), location='json')
+@marshal_with(
+    BatchResponseSchema(many=True), code=200,
+    description='Responses of the sub-requests',
+)
+def batch(*requests):
+    app = flask.current_app._get_current_object()
+    if flask.request.environ.get(BATCH_ENVIRON_KEY):
+        flask.abort(400, 'Batches cannot be nested.')
+    max_size = app.config.get('APISPEC_BATCH_MAX_SIZE', 50)
+    if len(requests) > max_size:
+        flask.abort(413, 'Batches are limited to {} requests.'.format(max_size))
+    base_url = flask.request.url_root
+    headers = [
+        (key, value) for key, value in flask.request.headers.items()
+        if key.lower() not in SKIPPED_HEADERS
+    ]
+    workers = app.config.get('APISPEC_BATCH_WORKERS', 1)
+
+    def run(sub):
+        return dispatch(app, sub, base_url, headers)
+
+    # Requests with side effects run one after the other, in order
+    if workers > 1 and len(requests) > 1 and all(
+            sub['method'].upper() in SAFE_METHODS for sub in requests):
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(run, requests))
+    return [run(sub) for sub in requests]
+
+
+def dispatch(app, sub, base_url, headers):
+    """Serve a sub-request through the URL map and error handlers of `app`,
+    returning its status, headers and decoded body.
+    """
+    headers = Headers(headers)
+    for key, value in (sub['headers'] or {}).items():
+        headers.set(key, value)
+    builder = EnvironBuilder(
+        path=sub['path'],
+        base_url=base_url,
+        method=sub['method'].upper(),
+        query_string=sub['query'],
+        headers=headers,
+        json=sub['body'],
+        environ_overrides={BATCH_ENVIRON_KEY: True},
+    )
+    # A fresh application context isolates `flask.g` between sub-requests and
+    # runs teardown functions after each of them, as for separate requests
+    with app.app_context(), app.request_context(builder.get_environ()):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as error:
+            response = app.handle_exception(error)
+        if response.is_json:
+            body = response.get_json(silent=True)
+        else:
+            body = response.get_data(as_text=True)
+        return {
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'body': body,
+        }
@@ -0,0 +1,166 @@
+"""Caching of encoded responses for views decorated with `cache_response`,
+and ETags for views decorated with `conditional_response`.
+
+Backends implement ``get(key)``, returning the cached entry or `None`, and
+``set(key, entry, ttl)``. Entries are tuples of the response status, headers
+and body bytes.
+"""
+import collections
+import json
+import pickle
+import threading
+import time
+import zlib
+
+import flask
+
+CACHED_METHODS = {'GET', 'HEAD'}
+
+
+class LRUCache:
+    """In-process cache that evicts the least recently used entries once it
+    holds `maxsize` of them, and expired entries when they are looked up.
+
+    :param int maxsize: Maximum number of entries
+    :param timer: Function returning the current time in seconds
+    """
+
+    def __init__(self, maxsize=1024, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.timer = timer
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, entry = self._entries[key]
+            except KeyError:
+                return None
+            if expires is not None and expires <= self.timer():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, ttl):
+        expires = self.timer() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SerializingCache:
+    """Local stand-in for shared stores such as Redis or memcached. Entries
+    are pickled to bytes, as a shared store requires, and kept in `store`
+    with their expiry time. Pass the same `store` to several applications to
+    emulate a store shared between workers.
+
+    :param dict store: Mapping of keys to expiry times and pickled entries
+    :param timer: Function returning the current time in seconds
+    """
+
+    def __init__(self, store=None, timer=time.time):
+        self.store = store if store is not None else {}
+        self.timer = timer
+
+    def get(self, key):
+        try:
+            expires, data = self.store[key]
+        except KeyError:
+            return None
+        if expires is not None and expires <= self.timer():
+            self.store.pop(key, None)
+            return None
+        return pickle.loads(data)
+
+    def set(self, key, entry, ttl):
+        expires = self.timer() + ttl if ttl is not None else None
+        self.store[key] = (expires, pickle.dumps(entry))
+
+    def clear(self):
+        self.store.clear()
+
+
+def make_key(options, args, kwargs):
+    """Return the cache key of a request to the current endpoint with parsed
+    `args` and `kwargs`, or `None` if the request should not be cached.
+    """
+    request = flask.request
+    if request.method not in CACHED_METHODS:
+        return None
+    key = options.get('key')
+    if key is not None:
+        value = key(*args, **kwargs)
+    else:
+        value = json.dumps([args, kwargs], sort_keys=True, default=repr)
+    return '{}:{}'.format(request.endpoint, value)
+
+
+def load(backend, key):
+    """Return the response cached under `key`, or `None` on a miss."""
+    entry = backend.get(key)
+    if entry is None:
+        return None
+    status, headers, body = entry
+    return flask.current_app.response_class(body, status=status, headers=headers)
+
+
+def save(backend, key, response, ttl):
+    """Cache the encoded body of a successful `response` under `key`."""
+    if response.status_code != 200 or response.is_streamed:
+        return response
+    response.add_etag()
+    entry = (response.status, list(response.headers.items()), response.get_data())
+    backend.set(key, entry, ttl)
+    return response
+
+
+def conditional(response):
+    """Answer `If-None-Match` requests matching the ETag of a cached response
+    with 304 Not Modified.
+    """
+    return response.make_conditional(flask.request)
+
+
+def matches(token):
+    """Return whether the current request may be answered with 304 Not
+    Modified because it is a GET or HEAD request whose `If-None-Match` header
+    matches `token`. Other methods may change state, so their responses are
+    never replaced.
+    """
+    request = flask.request
+    return (request.method in CACHED_METHODS and
+            request.if_none_match.contains_weak(token))
+
+
+def add_etag(response, token=None):
+    """Set the ETag of a successful `response` to `token`, or to a checksum of
+    its encoded body, and answer matching `If-None-Match` GET and HEAD
+    requests with 304 Not Modified.
+    """
+    if token is None:
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        token = '{:08x}'.format(zlib.crc32(response.get_data()))
+    response.set_etag(token)
+    if matches(token):
+        response.status_code = 304
+        response.set_data(b'')
+    return response
+
+
+def not_modified(token, headers=None):
+    """Return an empty 304 Not Modified response with the ETag `token`."""
+    response = flask.current_app.response_class(status=304, headers=headers)
+    response.set_etag(token)
+    return response
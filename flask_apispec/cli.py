@@ -0,0 +1,34 @@
+import json
+
+import click
+import flask
+from flask.cli import AppGroup
+
+cli = AppGroup('apispec', help='Build the API specification.')
+
+
+@cli.command('build')
+@click.option('-o', '--output', type=click.Path(dir_okay=False),
+              help='File to write to. Defaults to APISPEC_STATIC_SPEC_PATH, '
+                   'or standard output if that is not set.')
+@click.option('-f', '--format', 'format_', type=click.Choice(['json', 'yaml']),
+              help='Output format. Defaults to the format matching the file '
+                   'extension, or json.')
+def build(output, format_):
+    """Write the API specification of the application to a file."""
+    docs = flask.current_app.extensions['flask-apispec']
+    output = output or docs.static_spec_path
+    if format_ is None:
+        format_ = 'yaml' if output and output.endswith(('.yaml', '.yml')) else 'json'
+
+    if format_ == 'yaml':
+        content = docs.spec.to_yaml()
+    else:
+        content = json.dumps(docs.spec.to_dict(), indent=2) + '\n'
+
+    if output:
+        with open(output, 'w') as fp:
+            fp.write(content)
+        click.echo('Wrote API specification to {}'.format(output))
+    else:
+        click.echo(content, nl=False)
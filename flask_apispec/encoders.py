@@ -0,0 +1,90 @@
+import functools
+import json
+
+import flask
+
+# Backends tried, in order, when `APISPEC_JSON_ENCODER` is 'auto'
+AUTO_BACKENDS = ('orjson', 'msgspec', 'ujson', 'json')
+
+
+def _json_encoder(default=None):
+    encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=default)
+    return lambda obj: encoder.encode(obj).encode('utf-8')
+
+
+def _orjson_encoder(default=None):
+    import orjson
+    option = orjson.OPT_NON_STR_KEYS
+    return functools.partial(orjson.dumps, default=default, option=option)
+
+
+def _msgspec_encoder(default=None):
+    import msgspec
+    return msgspec.json.Encoder(enc_hook=default).encode
+
+
+def _ujson_encoder(default=None):
+    import ujson
+    return lambda obj: ujson.dumps(
+        obj, ensure_ascii=False, default=default).encode('utf-8')
+
+
+BACKENDS = {
+    'json': _json_encoder,
+    'orjson': _orjson_encoder,
+    'msgspec': _msgspec_encoder,
+    'ujson': _ujson_encoder,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(backend, default=None):
+    """Return a function encoding marshalled data to JSON bytes.
+
+    :param backend: Name of a backend in `BACKENDS`, 'auto' for the fastest
+        installed backend, or a callable returning `bytes`
+    :param default: Optional function serializing objects not supported by
+        the backend
+    :raises ImportError: If the requested backend is not installed
+    """
+    if callable(backend):
+        return backend
+    if backend == 'auto':
+        for name in AUTO_BACKENDS:
+            try:
+                return BACKENDS[name](default)
+            except ImportError:
+                continue
+    return BACKENDS[backend](default)
+
+
+def json_response(data):
+    """Build a JSON response from marshalled data, encoded with the backend
+    configured by `APISPEC_JSON_ENCODER`, or with `flask.jsonify` if no backend
+    is configured.
+    """
+    return response_factory(flask.current_app)(data)
+
+
+def app_encoder(app):
+    """Return a function encoding marshalled data to compact JSON bytes for
+    `app`, with its `APISPEC_JSON_ENCODER` backend, or with ``app.json`` if no
+    backend is configured.
+    """
+    backend = app.config.get('APISPEC_JSON_ENCODER')
+    if backend:
+        return get_encoder(backend, getattr(app.json, 'default', None))
+    dumps = functools.partial(app.json.dumps, separators=(',', ':'))
+    return lambda obj: dumps(obj).encode('utf-8')
+
+
+def response_factory(app):
+    """Return a function building JSON responses from marshalled data for
+    `app`, encoded with its `APISPEC_JSON_ENCODER` backend.
+    """
+    backend = app.config.get('APISPEC_JSON_ENCODER')
+    if not backend:
+        return flask.jsonify
+    encode = get_encoder(backend, getattr(app.json, 'default', None))
+    response_class = app.response_class
+    return lambda data: response_class(encode(data), mimetype='application/json')
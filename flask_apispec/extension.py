@@ -1,10 +1,27 @@
 import flask
 import functools
+import gzip
+import hashlib
+import multiprocessing
+import os
+import threading
 import types
+import warnings
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
 
+from flask_apispec import metrics
 from flask_apispec.apidoc import ViewConverter, ResourceConverter
+from flask_apispec.batch import batch
+from flask_apispec.cli import cli
+from flask_apispec.encoders import json_response
+from flask_apispec.paths import RouteIndex
+from flask_apispec.wrapper import get_runtime, reload_runtime
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
 
 
 class FlaskApiSpec:
@@ -36,13 +53,40 @@ class FlaskApiSpec:
     :param APISpec spec: apispec specification associated with API documentation
     :param bool document_options: Whether or not to include
         OPTIONS requests in the specification
+
+    Set `APISPEC_LAZY` to `True` to postpone converting registered views until
+    the spec is first requested from the Swagger JSON endpoint or through
+    ``spec.to_dict()``.
+
+    Set `APISPEC_PROCESSES` to a number greater than one to convert views
+    registered together, e.g. by `init_app` or `register_existing_resources`,
+    in a pool of forked processes.
+
+    Set `APISPEC_STATIC_SPEC_PATH` to serve a spec file written ahead of time
+    by ``flask apispec build`` instead of converting views at runtime.
+
+    Set `APISPEC_BATCH_URL` to add an endpoint that serves a JSON array of
+    sub-requests in one call. `APISPEC_BATCH_MAX_SIZE` limits the number of
+    sub-requests (50 by default), and `APISPEC_BATCH_WORKERS` sets the number
+    of threads used to serve batches of GET requests concurrently.
+
+    Set `APISPEC_METRICS` to time the phases of requests to decorated views,
+    and `APISPEC_METRICS_URL`, e.g. to ``'/apispec/metrics'``, to serve the
+    histograms recorded when `APISPEC_METRICS` is `True` in the Prometheus
+    text format.
     """
 
     def __init__(self, app=None, document_options=True):
         self._deferred = []
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._swagger_cache = {}
+        self.lazy = False
+        self.static_spec_path = None
         self.app = app
         self.view_converter = None
         self.resource_converter = None
+        self.routes = None
         self.spec = None
         self.document_options = document_options
 
@@ -55,21 +99,127 @@ class FlaskApiSpec:
                     make_apispec(self.app.config.get('APISPEC_TITLE', 'flask-apispec'),
                                  self.app.config.get('APISPEC_VERSION', 'v1'),
                                  self.app.config.get('APISPEC_OAS_VERSION', '2.0'))
+        self.app.extensions['flask-apispec'] = self
+        reload_runtime(self.app)
+        self.app.cli.add_command(cli)
         self.add_swagger_routes()
+        self.routes = RouteIndex(self.app.url_map)
         self.resource_converter = ResourceConverter(self.app,
                                                     self.spec,
-                                                    self.document_options)
-        self.view_converter = ViewConverter(self.app, self.spec, self.document_options)
+                                                    self.document_options,
+                                                    routes=self.routes)
+        self.view_converter = ViewConverter(
+            self.app, self.spec, self.document_options, routes=self.routes)
+        static_spec_path = self.app.config.get('APISPEC_STATIC_SPEC_PATH')
+        if static_spec_path:
+            self.static_spec_path = os.path.join(self.app.root_path, static_spec_path)
+        self.lazy = self.app.config.get('APISPEC_LAZY', False) or bool(static_spec_path)
+        if self.lazy:
+            self._make_lazy(self.spec)
 
-        for deferred in self._deferred:
-            deferred()
+        bounds = list(self._deferred)
+        if self.app.config.get('APISPEC_BATCH_URL'):
+            bounds.append(functools.partial(
+                self._register, batch, blueprint='flask-apispec'))
+        self._run(bounds)
+
+    def reload_runtime(self):
+        """Read the settings used when serving decorated views, such as
+        `APISPEC_WEBARGS_PARSER` and `APISPEC_FORMAT_RESPONSE`, from the
+        application config again. They are otherwise read once by `init_app`.
+        """
+        reload_runtime(self.app)
 
     def _defer(self, callable, *args, **kwargs):
         bound = functools.partial(callable, *args, **kwargs)
         self._deferred.append(bound)
         if self.app:
+            self._run([bound])
+        return bound
+
+    def _run(self, bounds):
+        if self.lazy:
+            with self._pending_lock:
+                self._pending.extend(bounds)
+                self._swagger_cache.clear()
+        else:
+            self._convert(bounds)
+
+    def _convert(self, bounds):
+        processes = self.app.config.get('APISPEC_PROCESSES') or 1
+        if (processes > 1 and len(bounds) > 1 and
+                'fork' in multiprocessing.get_all_start_methods()):
+            try:
+                results = self._convert_parallel(bounds, processes)
+                self._merge(results)
+                return
+            except Exception as error:
+                warnings.warn(
+                    'Could not convert views in parallel, converting them '
+                    'serially instead: {!r}'.format(error)
+                )
+        for bound in bounds:
             bound()
 
+    def _convert_parallel(self, bounds, processes):
+        global _parallel_state
+        size = -(-len(bounds) // (processes * 4))
+        chunks = [bounds[start:start + size] for start in range(0, len(bounds), size)]
+        _parallel_state = self, chunks
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(processes) as pool:
+                return pool.map(_convert_chunk, range(len(chunks)), chunksize=1)
+        finally:
+            _parallel_state = None
+
+    def _merge(self, results):
+        """Add paths and components converted by worker processes to the spec,
+        in the order a serial conversion would have added them.
+
+        :raises _MergeConflict: If workers assigned a component name to
+            different definitions
+        """
+        components = self.spec.components
+        refs = self.view_converter.marshmallow_plugin.converter.refs
+        names = {name: key for key, name in refs.items()}
+        merged_refs, merged_components = {}, {}
+        for _, chunk_components, chunk_refs in results:
+            for key, name in chunk_refs:
+                if names.setdefault(name, key) != key:
+                    raise _MergeConflict(name)
+                merged_refs[key] = name
+            for section, name, definition in chunk_components:
+                merged = merged_components.setdefault((section, name), definition)
+                if merged != definition:
+                    raise _MergeConflict(name)
+
+        refs.update(merged_refs)
+        for (section, name), definition in merged_components.items():
+            getattr(components, section)[name] = definition
+            getattr(components, section + '_lazy', {}).pop(name, None)
+        for paths, _, _ in results:
+            for path, operations in paths.items():
+                self.spec._paths.setdefault(path, {}).update(operations)
+        self._swagger_cache.clear()
+
+    def _make_lazy(self, spec):
+        to_dict = spec.to_dict
+
+        @functools.wraps(to_dict)
+        def lazy_to_dict():
+            self._flush()
+            return to_dict()
+
+        spec.to_dict = lazy_to_dict
+
+    def _flush(self):
+        """Run registrations postponed in lazy mode, in registration order."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            for bound in pending:
+                bound()
+
     def add_swagger_routes(self):
         blueprint = flask.Blueprint(
             'flask-apispec',
@@ -87,15 +237,90 @@ class FlaskApiSpec:
         if ui_url:
             blueprint.add_url_rule(ui_url, 'swagger-ui', self.swagger_ui)
 
+        batch_url = self.app.config.get('APISPEC_BATCH_URL')
+        if batch_url:
+            blueprint.add_url_rule(batch_url, 'batch', batch, methods=['POST'])
+
+        metrics_url = self.app.config.get('APISPEC_METRICS_URL')
+        if metrics_url:
+            blueprint.add_url_rule(metrics_url, 'metrics', self.metrics)
+
         self.app.register_blueprint(blueprint)
 
     def swagger_json(self):
-        return flask.jsonify(self.spec.to_dict())
+        if self.static_spec_path:
+            return self._send_static_spec()
+        encoding = self._swagger_encoding()
+        cached = self._swagger_cache.get(encoding)
+        if cached is None:
+            cached = self._swagger_cache[encoding] = self._serialize_swagger(encoding)
+        body, etag = cached
+
+        response = flask.current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        max_age = self.app.config.get('APISPEC_SWAGGER_MAX_AGE', 0)
+        if max_age:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        else:
+            response.cache_control.no_cache = True
+        if self.app.config.get('APISPEC_SWAGGER_COMPRESS', False):
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.content_encoding = encoding
+        return response.make_conditional(flask.request)
+
+    def metrics(self):
+        registry = get_runtime().metrics
+        if not isinstance(registry, metrics.Registry):
+            flask.abort(404)
+        return flask.current_app.response_class(
+            registry.to_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+    def _send_static_spec(self):
+        if self.static_spec_path.endswith(('.yaml', '.yml')):
+            mimetype = 'application/yaml'
+        else:
+            mimetype = 'application/json'
+        return flask.send_file(
+            self.static_spec_path,
+            mimetype=mimetype,
+            max_age=self.app.config.get('APISPEC_SWAGGER_MAX_AGE', 0),
+        )
+
+    def _swagger_encoding(self):
+        if not self.app.config.get('APISPEC_SWAGGER_COMPRESS', False):
+            return None
+        accepted = flask.request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _serialize_swagger(self, encoding=None):
+        """Serialize the spec for a content encoding. Results are cached in
+        `_swagger_cache` until the next view is registered.
+        """
+        if encoding is None:
+            body = json_response(self.spec.to_dict()).get_data()
+        else:
+            if None not in self._swagger_cache:
+                self._swagger_cache[None] = self._serialize_swagger()
+            body = self._swagger_cache[None][0]
+            if encoding == 'br':
+                body = brotli.compress(body)
+            else:
+                body = gzip.compress(body, mtime=0)
+        return body, hashlib.sha256(body).hexdigest()
 
     def swagger_ui(self):
         return flask.render_template('swagger-ui.html')
 
     def register_existing_resources(self):
+        bounds = []
         for name, rule in self.app.view_functions.items():
             try:
                 blueprint_name, _ = name.split('.')
@@ -106,10 +331,17 @@ class FlaskApiSpec:
             if name == 'static':
                 continue
 
-            try:
-                self.register(rule, blueprint=blueprint_name)
-            except TypeError:
-                pass
+            bound = functools.partial(
+                self._register_existing, rule, blueprint=blueprint_name)
+            self._deferred.append(bound)
+            bounds.append(bound)
+        self._run(bounds)
+
+    def _register_existing(self, target, blueprint=None):
+        try:
+            self._register(target, blueprint=blueprint)
+        except TypeError:
+            pass
 
     def register(self, target, endpoint=None, blueprint=None,
                  resource_class_args=None, resource_class_kwargs=None):
@@ -155,6 +387,44 @@ class FlaskApiSpec:
             raise TypeError()
         for path in paths:
             self.spec.path(**path)
+        self._swagger_cache.clear()
+
+
+class _MergeConflict(Exception):
+    pass
+
+
+COMPONENT_SECTIONS = (
+    'schemas', 'responses', 'parameters', 'headers', 'examples', 'security_schemes',
+)
+
+# Extension and chunks of registrations inherited by forked worker processes
+_parallel_state = None
+
+
+def _convert_chunk(index):
+    """Convert a chunk of registrations in a forked worker process. Returns the
+    paths, components and marshmallow schema references added to the spec.
+    """
+    docs, chunks = _parallel_state
+    spec = docs.spec
+    refs = docs.view_converter.marshmallow_plugin.converter.refs
+    known_refs = set(refs)
+    known_components = {
+        section: set(getattr(spec.components, section, {}))
+        for section in COMPONENT_SECTIONS
+    }
+    spec._paths = {}
+    for bound in chunks[index]:
+        bound()
+    components = [
+        (section, name, definition)
+        for section in COMPONENT_SECTIONS
+        for name, definition in getattr(spec.components, section, {}).items()
+        if name not in known_components[section]
+    ]
+    new_refs = [(key, name) for key, name in refs.items() if key not in known_refs]
+    return spec._paths, components, new_refs
 
 
 def make_apispec(title='flask-apispec', version='v1', openapi_version='2.0'):
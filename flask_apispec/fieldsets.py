@@ -0,0 +1,166 @@
+"""Sparse fieldsets for views decorated with `sparse_fields`.
+
+Clients list the fields of the response they need in a query argument, and
+the result is dumped with an instance of the response schema class
+restricted to them with ``only``, so that other fields, including nested and
+method fields, are never computed.
+"""
+import threading
+
+import flask
+import marshmallow as ma
+from webargs import fields as webargs_fields
+
+from flask_apispec import utils
+
+# Key of the schema selected by the current request in `flask.g`
+SCHEMA_KEY = '_flask_apispec_fields'
+
+# Schemas returned by `select`, by the id of the schema they restrict and the
+# selected fields
+_selected = {}
+_selected_lock = threading.Lock()
+
+
+def make_schema(arg):
+    """Return the schema class of the query argument of `sparse_fields`."""
+    return ma.Schema.from_dict({
+        arg: webargs_fields.DelimitedList(ma.fields.Str(), metadata={
+            'description': (
+                'Comma-separated fields of the response to return, '
+                'e.g. "name,owner.name"; all fields by default'
+            ),
+        }),
+    })
+
+
+def parse(parser, options, schema):
+    """Parse the fields requested for the current request and keep them,
+    with `schema` restricted to them, for `selection`.
+
+    Invalid fields are handled by `parser` like other validation errors.
+    """
+    arg = options['arg']
+    selected = []
+
+    def validate(parsed):
+        if parsed.get(arg):
+            names = tuple(sorted(set(parsed[arg])))
+            try:
+                selected.append((names, select(schema, names)))
+            except ValueError as error:
+                raise ma.ValidationError({arg: [str(error)]})
+
+    parser.parse(
+        utils.resolve_schema(options['schema']), location='query', validate=validate)
+    selected = selected[0] if selected else None
+    setattr(flask.g, SCHEMA_KEY, selected)
+    return selected
+
+
+def selection():
+    """Return the fields selected by `parse` and the schema restricted to
+    them, or `None` if the request selects no fields.
+    """
+    return flask.g.get(SCHEMA_KEY)
+
+
+def select(schema, names):
+    """Return a shared instance of the class of `schema` that only dumps the
+    fields `names`, which may refer to fields of nested schemas with dots.
+
+    The instance keeps the options of `schema`, e.g. its `context` and the
+    ``only`` and ``exclude`` options of its nested schemas, and is never
+    shared by schemas that opt out of pooling with ``apispec_pool = False``.
+
+    :raises ValueError: If `schema` does not dump some of `names`
+    """
+    only = tuple(sorted(set(names)))
+    unknown = [name for name in only if not dumps(schema, name)]
+    if unknown:
+        raise ValueError('Unknown fields: {}.'.format(', '.join(unknown)))
+    if not getattr(getattr(schema, 'Meta', None), 'apispec_pool', True):
+        return restrict(schema, make_tree(only))
+    key = (id(schema), only)
+    cached = _selected.get(key)
+    if cached is None:
+        with _selected_lock:
+            cached = _selected.get(key)
+            if cached is None:
+                # Keep `schema` alive so that its id is not reused
+                cached = (schema, restrict(schema, make_tree(only)))
+                if len(_selected) < utils.SCHEMA_POOL_SIZE:
+                    _selected[key] = cached
+    return cached[1]
+
+
+def make_tree(names):
+    """Return the dotted `names` as a tree of field names, in which fields
+    selected as a whole map to `None`.
+    """
+    tree = {}
+    for name in names:
+        head, _, rest = name.partition('.')
+        if not rest:
+            tree[head] = None
+        elif tree.get(head, ()) is not None:
+            tree.setdefault(head, []).append(rest)
+    return {head: rest and make_tree(rest) for head, rest in tree.items()}
+
+
+def restrict(schema, tree):
+    """Return an instance of the class of `schema` that only dumps the fields
+    in `tree`, constructed with the options of `schema`, including the
+    ``only`` and ``exclude`` options that it applies to nested schemas.
+    """
+    only, exclude = nested_options(schema, tree)
+    kwargs = {}
+    if getattr(schema, 'context', None):
+        # `context` is deprecated, and removed in marshmallow 4
+        kwargs['context'] = schema.context
+    return type(schema)(
+        only=only,
+        exclude=exclude,
+        many=schema.many,
+        load_only=schema.load_only,
+        dump_only=schema.dump_only,
+        partial=schema.partial,
+        unknown=schema.unknown,
+        **kwargs
+    )
+
+
+def nested_options(schema, tree):
+    """Return the ``only`` and ``exclude`` options, as dotted paths, that
+    restrict `schema` to the fields in `tree` without dumping any field that
+    `schema` does not dump.
+    """
+    only, exclude = [], list(schema.exclude)
+    for name, subtree in tree.items():
+        field = schema.fields[name]
+        # Lists of nested schemas are restricted like nested schemas
+        nested = getattr(field, 'inner', field)
+        only.append(name)
+        if subtree is not None:
+            nested_only, nested_exclude = nested_options(nested.schema, subtree)
+        elif isinstance(nested, ma.fields.Nested):
+            # Options that `schema` applies to the nested schema
+            nested_only, nested_exclude = nested.only or (), nested.exclude
+        else:
+            continue
+        only.extend('{}.{}'.format(name, each) for each in nested_only)
+        exclude.extend('{}.{}'.format(name, each) for each in nested_exclude)
+    return only, exclude
+
+
+def dumps(schema, name):
+    """Return whether `schema` dumps the field at the dotted path `name`."""
+    head, _, rest = name.partition('.')
+    field = schema.dump_fields.get(head)
+    if field is None or not rest:
+        return field is not None
+    # Lists of nested schemas are restricted like nested schemas
+    field = getattr(field, 'inner', field)
+    if not isinstance(field, ma.fields.Nested):
+        return False
+    return dumps(field.schema, rest)
@@ -0,0 +1,262 @@
+"""Timing of the phases of requests to decorated views.
+
+Set `APISPEC_METRICS` to enable it. Wrappers then time parsing each
+location, calling the view, dumping its result and encoding the response,
+and pass the timings of each request to a sink. A sink is a callable that
+receives the endpoint, the status code, and a list of ``(phase, location,
+seconds)`` tuples, where `location` is only set for the ``'parse'`` phase.
+
+The timings of requests whose result is marshalled also describe the
+response in their `response` attribute: the name of the schema, the size of
+the encoded body, the number of items dumped by ``many`` schemas and the
+time spent dumping them. Responses exceeding the `THRESHOLDS` set in the
+config are logged as warnings.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+import flask
+from flask.signals import Namespace
+from werkzeug.wrappers import Response
+
+logger = logging.getLogger(__name__)
+
+_signals = Namespace()
+
+#: Sent with the endpoint, status code and timings of each request
+request_timed = _signals.signal('request-timed')
+
+# Timings of the request being served, if metrics are enabled
+_timings = contextvars.ContextVar('flask_apispec_timings', default=None)
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+BYTES_BUCKETS = tuple(4 ** power * 256 for power in range(10))
+
+ITEMS_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+PHASE_SECONDS = 'flask_apispec_phase_seconds'
+RESPONSE_BYTES = 'flask_apispec_response_bytes'
+RESPONSE_ITEMS = 'flask_apispec_response_items'
+DUMP_SECONDS = 'flask_apispec_dump_seconds'
+
+# Help text and buckets of the metrics recorded by `Registry`
+METRICS = {
+    PHASE_SECONDS: (
+        'Time spent in each phase of requests to decorated views',
+        DEFAULT_BUCKETS,
+    ),
+    RESPONSE_BYTES: (
+        'Size of the encoded body of marshalled responses',
+        BYTES_BUCKETS,
+    ),
+    RESPONSE_ITEMS: (
+        'Number of items dumped by schemas with many=True',
+        ITEMS_BUCKETS,
+    ),
+    DUMP_SECONDS: (
+        'Time spent dumping the results of decorated views',
+        DEFAULT_BUCKETS,
+    ),
+}
+
+# Config keys of the thresholds above which responses are logged, by the
+# key of the measure in `Timings.response`
+THRESHOLDS = {
+    'bytes': 'APISPEC_WARN_RESPONSE_BYTES',
+    'items': 'APISPEC_WARN_RESPONSE_ITEMS',
+    'dump_seconds': 'APISPEC_WARN_DUMP_SECONDS',
+}
+
+
+def make_sink(value):
+    """Return the sink configured by `APISPEC_METRICS`: `True` records
+    histograms in a new `Registry`, ``'signal'`` sends `request_timed`, and
+    callables are used as is.
+    """
+    if not value:
+        return None
+    if value is True:
+        return Registry()
+    if value == 'signal':
+        return send_signal
+    if callable(value):
+        return value
+    raise ValueError('Invalid APISPEC_METRICS: {!r}'.format(value))
+
+
+def thresholds(config):
+    """Return the thresholds set in `config`, by measure."""
+    return {
+        measure: config[key] for measure, key in THRESHOLDS.items()
+        if config.get(key) is not None
+    }
+
+
+def discard(endpoint, status, timings):
+    """Sink used when only thresholds are configured."""
+
+
+def send_signal(endpoint, status, timings):
+    request_timed.send(
+        flask.current_app._get_current_object(),
+        endpoint=endpoint, status=status, timings=timings,
+    )
+
+
+class Timings(list):
+    """Durations of the phases of one request."""
+
+    #: Measures of the marshalled response, if any
+    response = None
+
+    def add(self, phase, start, location=None):
+        seconds = time.perf_counter() - start
+        self.append((phase, location, seconds))
+        return seconds
+
+
+def measure(timings, schema, items, response, dump_seconds, thresholds):
+    """Describe the response marshalled by `schema` in `timings`, and log a
+    warning for each of its measures that exceeds its threshold.
+
+    :param items: Number of items dumped, or `None` for a single object
+    """
+    size = None
+    if isinstance(response, Response) and not response.is_streamed:
+        size = response.content_length
+        if size is None:
+            size = len(response.get_data())
+    measures = timings.response = {
+        'schema': type(schema).__name__,
+        'bytes': size,
+        'items': items,
+        'dump_seconds': dump_seconds,
+    }
+    for name, limit in thresholds.items():
+        value = measures[name]
+        if value is not None and value > limit:
+            logger.warning(
+                'Response of %s dumped with %s exceeds the %s threshold: %s > %s',
+                flask.request.endpoint, measures['schema'], name, value, limit,
+            )
+
+
+def start():
+    """Start recording the timings of a request; returns a token for `stop`."""
+    return _timings.set(Timings())
+
+
+def stop(token):
+    """Stop recording and return the timings recorded since `start`."""
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+def current():
+    """Return the `Timings` of the current request, or `None` if metrics are
+    disabled.
+    """
+    return _timings.get()
+
+
+class Histogram:
+    """Counts of observed values by bucket, with their sum and count.
+
+    :param buckets: Sorted upper bounds of the buckets
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """In-memory histograms, by metric name and labels, that can be exported
+    in the Prometheus text format. Registries are sinks that record the
+    timings of each phase in the ``flask_apispec_phase_seconds`` histogram,
+    and the measures of marshalled responses by endpoint and schema.
+
+    :param dict buckets: Optional buckets by metric name, instead of those of
+        `METRICS`
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets or {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, endpoint, status, timings):
+        for phase, location, seconds in timings:
+            labels = {'endpoint': endpoint, 'status': str(status), 'phase': phase}
+            if location is not None:
+                labels['location'] = location
+            self.observe(PHASE_SECONDS, seconds, **labels)
+        measures = getattr(timings, 'response', None)
+        if measures is not None:
+            labels = {'endpoint': endpoint, 'schema': measures['schema']}
+            if measures['bytes'] is not None:
+                self.observe(RESPONSE_BYTES, measures['bytes'], **labels)
+            if measures['items'] is not None:
+                self.observe(RESPONSE_ITEMS, measures['items'], **labels)
+            self.observe(DUMP_SECONDS, measures['dump_seconds'], **labels)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                buckets = self.buckets.get(name) or METRICS[name][1]
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def get(self, name, **labels):
+        """Return the histogram of metric `name` with `labels`, if any."""
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def to_prometheus(self):
+        """Return all histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: item[0])
+            seen = set()
+            for (name, labels), histogram in items:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append('# HELP {} {}'.format(name, METRICS[name][0]))
+                    lines.append('# TYPE {} histogram'.format(name))
+                cumulative = 0
+                bounds = [repr(float(bound)) for bound in histogram.buckets] + ['+Inf']
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append('{}_bucket{} {}'.format(
+                        name, _format_labels(labels + (('le', bound), )), cumulative))
+                lines.append('{}_sum{} {!r}'.format(
+                    name, _format_labels(labels), float(histogram.sum)))
+                lines.append('{}_count{} {}'.format(
+                    name, _format_labels(labels), histogram.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    return '{' + ','.join(
+        '{}="{}"'.format(key, _escape(value)) for key, value in labels
+    ) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
@@ -0,0 +1,148 @@
+"""Pagination of the results of views decorated with `paginate`.
+
+Cursors are opaque to clients and encode the offset of the first item of a
+page. Results are sliced before they are dumped, so that at most one page,
+plus one item to tell whether another page follows, is ever loaded.
+"""
+import base64
+import binascii
+import collections
+import itertools
+import urllib.parse
+from collections.abc import Mapping
+
+import flask
+import marshmallow as ma
+import werkzeug
+
+from flask_apispec import utils
+
+# Key of the page requested by the current request in `flask.g`
+PAGE_KEY = '_flask_apispec_page'
+
+Page = collections.namedtuple('Page', ['items', 'offset', 'limit', 'next_cursor'])
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the offset encoded in `cursor`.
+
+    :raises ValueError: If `cursor` was not returned by `encode_cursor`
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        offset = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii')
+    except (binascii.Error, UnicodeError):
+        raise ValueError(cursor)
+    if not offset.isdigit():
+        raise ValueError(cursor)
+    return int(offset)
+
+
+class Cursor(ma.fields.String):
+    """Field that loads a cursor to the offset it encodes, and dumps offsets
+    to cursors.
+    """
+
+    default_error_messages = {'invalid_cursor': 'Not a valid cursor.'}
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return encode_cursor(value)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs)
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise self.make_error('invalid_cursor')
+
+
+def make_schema(limit, max_limit, cursor_arg, limit_arg):
+    """Return the schema class of the query arguments of paginated views."""
+    return ma.Schema.from_dict({
+        cursor_arg: Cursor(load_default=0, metadata={
+            'description': 'Cursor of the page to return, from a previous page',
+            # Document the cursor of the first page rather than its offset
+            'default': encode_cursor(0),
+        }),
+        limit_arg: ma.fields.Int(
+            load_default=limit,
+            validate=ma.validate.Range(min=1, max=max_limit),
+            metadata={'description': 'Maximum number of items to return'},
+        ),
+    })
+
+
+def parse(parser, options):
+    """Parse the cursor and limit of the current request and keep them for
+    `get_page`.
+    """
+    parsed = parser.parse(utils.resolve_schema(options['schema']), location='query')
+    page = parsed[options['cursor_arg']], parsed[options['limit_arg']]
+    setattr(flask.g, PAGE_KEY, page)
+    return page
+
+
+def requested_page():
+    """Return the offset and limit parsed by `parse`, if any."""
+    return flask.g.get(PAGE_KEY)
+
+
+def get_page(result, offset, limit):
+    """Return the items of `result` on the page of `limit` items starting at
+    `offset`. Sequences and queries that support slicing, e.g. SQLAlchemy
+    queries, are sliced; other iterables are consumed up to the page.
+    """
+    stop = offset + limit + 1
+    if hasattr(result, '__getitem__') and not isinstance(result, (Mapping, str)):
+        items = list(result[offset:stop])
+    else:
+        items = list(itertools.islice(result, offset, stop))
+    next_cursor = encode_cursor(offset + limit) if len(items) > limit else None
+    return Page(items[:limit], offset, limit, next_cursor)
+
+
+def envelope(output, page, options):
+    """Wrap the dumped items of `page` in the envelope set by `paginate`."""
+    if options['envelope'] is None:
+        return output
+    return {options['envelope']: output, options['next_key']: page.next_cursor}
+
+
+def add_link(response, page, options):
+    """Add a ``Link`` header to the next page of results to `response`."""
+    if page.next_cursor is None:
+        return response
+    if not isinstance(response, werkzeug.Response):
+        response = flask.current_app.make_response(response)
+    request = flask.request
+    args = request.args.copy()
+    args[options['cursor_arg']] = page.next_cursor
+    args[options['limit_arg']] = page.limit
+    url = '{}?{}'.format(
+        request.base_url, urllib.parse.urlencode(list(args.items(multi=True))))
+    response.headers.add('Link', '<{}>; rel="next"'.format(url))
+    return response
+
+
+def envelope_schema(schema, options):
+    """Return the documented schema of paginated responses dumped by `schema`."""
+    if not getattr(schema, 'many', False):
+        schema = {'type': 'array', 'items': schema}
+    if options['envelope'] is None:
+        return schema
+    return {
+        'type': 'object',
+        'properties': {
+            options['envelope']: schema,
+            options['next_key']: {
+                'type': 'string',
+                'description': 'Cursor of the next page, if any',
+            },
+        },
+    }
@@ -0,0 +1,204 @@
+"""Helpers that let wrappers skip or merge webargs parse passes that cannot
+produce any arguments, or that read the same location.
+"""
+import threading
+
+import marshmallow as ma
+from webargs import flaskparser
+
+from flask_apispec import utils
+
+FORM_MIMETYPES = {'application/x-www-form-urlencoded', 'multipart/form-data'}
+
+
+def _json_empty(request):
+    return not request.is_json
+
+
+def _form_empty(request):
+    return request.mimetype not in FORM_MIMETYPES or not request.form
+
+
+def _files_empty(request):
+    return request.mimetype != 'multipart/form-data' or not request.files
+
+
+# Whether a location of a request holds no data, keyed by location and the
+# name of the `FlaskParser` loader that reads it
+EMPTY_CHECKS = {
+    'querystring': ('load_querystring', lambda request: not request.args),
+    'query': ('load_querystring', lambda request: not request.args),
+    'json': ('load_json', _json_empty),
+    'form': ('load_form', _form_empty),
+    'files': ('load_files', _files_empty),
+    'cookies': ('load_cookies', lambda request: not request.cookies),
+    'view_args': ('load_view_args', lambda request: not request.view_args),
+    'path': ('load_view_args', lambda request: not request.view_args),
+    'json_or_form': (
+        'load_json_or_form',
+        lambda request: _json_empty(request) and _form_empty(request),
+    ),
+}
+
+# Methods of `FlaskParser` whose behavior `EMPTY_CHECKS` relies on
+PARSER_METHODS = ('pre_load', '_raw_load_json', '_makeproxy')
+
+# Methods of `Schema` that the schema class of a parser must not override, so
+# that loading empty data from dict args results in no arguments
+SCHEMA_METHODS = ('load', '_do_load', '_invoke_load_processors')
+
+
+def empty_checks(parser):
+    """Return the functions that tell whether a location of a request is
+    empty, for the locations that `parser` loads like `FlaskParser` does.
+    """
+    if not isinstance(parser, flaskparser.FlaskParser):
+        return {}
+    cls = type(parser)
+    stock = flaskparser.FlaskParser
+    if any(getattr(cls, name) is not getattr(stock, name) for name in PARSER_METHODS):
+        return {}
+    if not plain_schema_class(parser.schema_class):
+        return {}
+    checks = {}
+    for location, (loader, check) in EMPTY_CHECKS.items():
+        if (parser.__location_map__.get(location) == loader and
+                getattr(cls, loader) is getattr(stock, loader)):
+            checks[location] = check
+    return checks
+
+
+def plain_schema_class(schema_cls):
+    """Return whether `schema_cls`, e.g. the schema class that parsers load
+    dict args with, loads data like `Schema`, i.e. has no hooks and does not
+    override loading.
+    """
+    hooks = getattr(schema_cls, '_hooks', None)
+    if hooks is None or any(hooks.values()):
+        return False
+    return all(
+        getattr(schema_cls, name) is getattr(ma.Schema, name) for name in SCHEMA_METHODS
+    )
+
+
+def is_optional(args):
+    """Return whether parsing an empty location with `args` always results in
+    no arguments, i.e. whether `args` has no required fields, no defaults and
+    no hooks, does not override loading, and does not load a list.
+    """
+    if isinstance(args, dict):
+        fields = args.values()
+    elif isinstance(args, DictArgs):
+        return all(map(is_optional, args))
+    elif utils.is_instance_or_subclass(args, ma.Schema):
+        schema = utils.resolve_schema(args)
+        if schema.many or not plain_schema_class(type(schema)):
+            return False
+        fields = schema.fields.values()
+    else:
+        return False
+    return not any(
+        field.required or field.load_default is not ma.missing
+        for field in fields
+    )
+
+
+def merge_args(args):
+    """Merge the dicts of fields of `args` that read the same location into
+    one schema class, so that the location is parsed once.
+
+    :param args: Pairs of args and location, in the order they are parsed
+    :returns: Pairs of args and location; dicts are replaced by `DictArgs`,
+        and merged dicts take the place of the first one
+
+    A dict is only merged into an earlier one if none of its arguments could
+    also be set by the args in between, so that arguments override each
+    other in the same order as when each dict is parsed separately.
+    """
+    merged = []
+    groups = []
+    # Groups that dicts can still be merged into, by location; names holds
+    # the arguments set by the group and by the args parsed after it
+    open_groups = {}
+    for schema, location in args:
+        names = argument_names(schema)
+        group = open_groups.get(location) if isinstance(schema, dict) else None
+        if group is not None and not names & group['names']:
+            group['fields'].append(schema)
+        else:
+            group = None
+            merged.append((schema, location))
+        if names is None:
+            open_groups.clear()
+            continue
+        for other in open_groups.values():
+            other['names'] |= names
+        if group is None and isinstance(schema, dict):
+            group = {'index': len(merged) - 1, 'fields': [schema], 'names': set(names)}
+            open_groups[location] = group
+            groups.append(group)
+    for group in groups:
+        index = group['index']
+        merged[index] = (DictArgs(group['fields']), merged[index][1])
+    return merged
+
+
+class DictArgs(tuple):
+    """Dicts of fields passed to `use_kwargs` that are parsed together, with
+    a schema class generated by `schema_from_dict` from the schema class of
+    the parser.
+    """
+
+
+# Schema classes generated from dicts of fields, by the schema class they
+# derive from and the ids of the dicts
+_dict_schemas = {}
+_dict_schemas_lock = threading.Lock()
+
+
+def schema_from_dict(*dicts, schema_class=ma.Schema, cache=True):
+    """Return a subclass of `schema_class` with the fields of `dicts`,
+    generating it only once for the same dicts and schema class.
+
+    Dicts are those passed to `use_kwargs`, so the cache only grows with the
+    number of decorated views; the dicts must not be modified afterwards.
+    Pass ``cache=False`` for dicts that may differ between requests, e.g.
+    dicts resolved from per-instance refs. At most `utils.SCHEMA_POOL_SIZE`
+    classes are cached.
+    """
+    if not cache:
+        return make_schema(schema_class, dicts)
+    key = (schema_class,) + tuple(map(id, dicts))
+    cached = _dict_schemas.get(key)
+    if cached is None:
+        with _dict_schemas_lock:
+            cached = _dict_schemas.get(key)
+            if cached is None:
+                # Keep `dicts` alive so that their ids are not reused
+                cached = (dicts, make_schema(schema_class, dicts))
+                if len(_dict_schemas) < utils.SCHEMA_POOL_SIZE:
+                    _dict_schemas[key] = cached
+    return cached[1]
+
+
+def make_schema(schema_class, dicts):
+    fields = {}
+    for each in dicts:
+        fields.update(each)
+    return schema_class.from_dict(fields)
+
+
+def argument_names(args):
+    """Return the names of the keyword arguments that parsing `args` can set,
+    or `None` if they are not known in advance.
+    """
+    if isinstance(args, dict):
+        fields = args
+    elif utils.is_instance_or_subclass(args, ma.Schema):
+        schema = utils.resolve_schema(args)
+        if schema.many or not plain_schema_class(type(schema)):
+            return None
+        fields = schema.fields
+    else:
+        return None
+    return {field.attribute or name for name, field in fields.items()}
@@ -1,4 +1,5 @@
 import re
+import threading
 
 import werkzeug.routing
 
@@ -17,26 +18,65 @@ CONVERTER_MAPPING = {
 
 DEFAULT_TYPE = ('string', None)
 
+# Incremented when converters are registered, to invalidate `RouteIndex`es
+_generation = 0
+
+
+def register_converter(converter, type_, format_=None):
+    """Document path arguments matched by `converter` with the OpenAPI `type_`
+    and `format_`.
+
+    Usage:
+
+    .. code-block:: python
+
+        app.url_map.converters['uuid'] = UUIDConverter
+        register_converter(UUIDConverter, 'string', 'uuid')
+
+    :param converter: werkzeug converter class; subclasses are documented
+        the same unless registered themselves
+    :param str type_: OpenAPI type
+    :param str format_: Optional OpenAPI format
+    """
+    global _generation
+    CONVERTER_MAPPING[converter] = (type_, format_)
+    _generation += 1
+
+
+def converter_type(converter):
+    """Return the OpenAPI type and format of arguments matched by the werkzeug
+    `converter` instance.
+    """
+    for cls in type(converter).__mro__:
+        if cls in CONVERTER_MAPPING:
+            return CONVERTER_MAPPING[cls]
+    return DEFAULT_TYPE
+
 
 def rule_to_params(rule, overrides=None):
+    params = [argument_to_param(argument, rule) for argument in rule.arguments]
+    return override_params(params, overrides)
+
+
+def override_params(params, overrides=None):
+    """Return copies of the path `params` of a rule updated with `overrides`,
+    followed by the header and query parameters of `overrides`.
+    """
     overrides = (overrides or {})
-    result = [
-        argument_to_param(argument, rule, overrides.get(argument, {}))
-        for argument in rule.arguments
-    ]
-    for key in overrides.keys():
-        if overrides[key].get('in') in ('header', 'query'):
-            overrides[key]['name'] = overrides[key].get('name', key)
-            result.append(overrides[key])
+    result = [dict(param, **overrides.get(param['name'], {})) for param in params]
+    for key, override in overrides.items():
+        if override.get('in') in ('header', 'query'):
+            result.append(dict(override, name=override.get('name', key)))
     return result
 
+
 def argument_to_param(argument, rule, override=None):
     param = {
         'in': 'path',
         'name': argument,
         'required': True,
     }
-    type_, format_ = CONVERTER_MAPPING.get(type(rule._converters[argument]), DEFAULT_TYPE)
+    type_, format_ = converter_type(rule._converters[argument])
     param['type'] = type_
     if format_ is not None:
         param['format'] = format_
@@ -44,3 +84,49 @@ def argument_to_param(argument, rule, override=None):
         param['default'] = rule.defaults[argument]
     param.update(override or {})
     return param
+
+
+class RouteIndex:
+    """Paths and path parameters of the rules of a URL map, computed once per
+    rule and shared by all conversions of views.
+
+    Rules added to the map after the index is created are indexed when first
+    looked up; registering a converter recomputes the parameters of all rules.
+
+    :param url_map: werkzeug :class:`Map <werkzeug.routing.Map>`
+    """
+
+    def __init__(self, url_map):
+        self.url_map = url_map
+        self.generation = _generation
+        # Rules are not hashable, so entries are keyed by id and keep their
+        # rule alive
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def rules(self, endpoint):
+        """Return the rules of `endpoint`.
+
+        :raises KeyError: If no rule has `endpoint`
+        """
+        return list(self.url_map.iter_rules(endpoint))
+
+    def path(self, rule):
+        """Return the OpenAPI path template of `rule`."""
+        return self._entry(rule)[1]
+
+    def params(self, rule, overrides=None):
+        """Return the parameters of `rule`, like `rule_to_params`."""
+        return override_params(self._entry(rule)[2], overrides)
+
+    def _entry(self, rule):
+        if self.generation != _generation:
+            with self._lock:
+                self._entries.clear()
+                self.generation = _generation
+        entry = self._entries.get(id(rule))
+        if entry is None:
+            params = tuple(
+                argument_to_param(argument, rule) for argument in rule.arguments)
+            entry = self._entries[id(rule)] = (rule, rule_to_path(rule), params)
+        return entry
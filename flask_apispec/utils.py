@@ -1,7 +1,22 @@
 import functools
+import operator
+import threading
 
 import marshmallow as ma
 
+# Bumped whenever annotations change so that compiled view plans are rebuilt
+_generation = 0
+
+
+def touch():
+    """Invalidate compiled view plans after annotations have changed."""
+    global _generation
+    _generation += 1
+
+
+def generation():
+    return _generation
+
 
 def resolve_resource(resource, **kwargs):
     resource_class_args = kwargs.get('resource_class_args') or ()
@@ -13,15 +28,74 @@ def resolve_resource(resource, **kwargs):
 
 def resolve_schema(schema, request=None):
     if isinstance(schema, type) and issubclass(schema, ma.Schema):
-        schema = schema()
+        schema = pooled_schema(schema)
     elif callable(schema):
         schema = schema(request)
     return schema
 
+
+SCHEMA_POOL_SIZE = 1024
+
+_schema_pool = {}
+_schema_pool_lock = threading.Lock()
+
+
+def pooled_schema(schema_cls, **kwargs):
+    """Return a shared instance of `schema_cls` constructed with `kwargs`.
+
+    Instances are never modified once they are in the pool, so one instance can
+    serve concurrent requests in threaded workers. Schemas that keep
+    per-request state, e.g. by mutating `self.context`, can opt out by setting
+    ``apispec_pool = False`` on their `Meta` options.
+    """
+    if not getattr(getattr(schema_cls, 'Meta', None), 'apispec_pool', True):
+        return schema_cls(**kwargs)
+    try:
+        key = (schema_cls, freeze(kwargs))
+        schema = _schema_pool.get(key)
+    except TypeError:
+        return schema_cls(**kwargs)
+    if schema is None:
+        with _schema_pool_lock:
+            schema = _schema_pool.get(key)
+            if schema is None:
+                schema = schema_cls(**kwargs)
+                if len(_schema_pool) < SCHEMA_POOL_SIZE:
+                    _schema_pool[key] = schema
+    return schema
+
+
+def freeze(value):
+    """Return a hashable equivalent of a structure of dicts, lists and sets.
+
+    :raises TypeError: If the structure contains unhashable values
+    """
+    if isinstance(value, dict):
+        return frozenset((key, freeze(each)) for key, each in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(each) for each in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    hash(value)
+    return value
+
+
 class Ref:
+    """Look up the value of an annotation option on the resource it is used
+    with, by attribute name.
 
-    def __init__(self, key):
+    Refs are resolved once per resource class, so that their values can be
+    defined or overridden by subclasses. Pass ``per_instance=True`` for values
+    that are set on each instance, e.g. from constructor arguments, to resolve
+    the ref on every request instead.
+
+    :param str key: Name of the attribute to look up
+    :param bool per_instance: Resolve against each resource instance
+    """
+
+    def __init__(self, key, per_instance=False):
         self.key = key
+        self.per_instance = per_instance
 
     def resolve(self, obj):
         return getattr(obj, self.key, None)
@@ -39,16 +113,84 @@ def resolve_refs(obj, attr):
         return attr.resolve(obj)
     return attr
 
+
+def find_refs(attr, path=()):
+    """Return the paths of the `Ref` values nested in the dicts and lists of
+    `attr`, as tuples of keys and indices.
+    """
+    if isinstance(attr, Ref):
+        return (path, )
+    if isinstance(attr, dict):
+        items = attr.items()
+    elif isinstance(attr, list):
+        items = enumerate(attr)
+    else:
+        return ()
+    return tuple(
+        ref for key, value in items
+        for ref in find_refs(value, path + (key, ))
+    )
+
+
+def replace_ref(attr, path, obj):
+    """Resolve the `Ref` at `path` in `attr` against `obj`, copying only the
+    containers along `path`.
+    """
+    if not path:
+        return attr.resolve(obj)
+    key, rest = path[0], path[1:]
+    attr = dict(attr) if isinstance(attr, dict) else list(attr)
+    attr[key] = replace_ref(attr[key], rest, obj)
+    return attr
+
+
 class Annotation:
+    """Immutable set of options recorded by an annotation decorator.
+
+    Options are stored as a tuple and the hash is computed once, so that
+    annotations can be compared and deduplicated cheaply when resources are
+    inherited. The paths of any `Ref` values in the options are recorded in
+    `refs`, prefixed with the index of their option.
+    """
+
+    __slots__ = ('options', 'inherit', 'apply', 'refs', '_hash')
 
     def __init__(self, options=None, inherit=None, apply=None):
-        self.options = options or []
-        self.inherit = inherit
-        self.apply = apply
+        options = tuple(options or ())
+        self._init(options, inherit, apply, find_refs(list(options)))
+
+    def _init(self, options, inherit, apply, refs):
+        object.__setattr__(self, 'options', options)
+        object.__setattr__(self, 'inherit', inherit)
+        object.__setattr__(self, 'apply', apply)
+        object.__setattr__(self, 'refs', refs)
+        object.__setattr__(self, '_hash', None)
+
+    @classmethod
+    def _make(cls, options, inherit, apply, refs):
+        annotation = cls.__new__(cls)
+        annotation._init(options, inherit, apply, refs)
+        return annotation
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, '_hash', hash((
+                fingerprint(self.options), self.inherit, self.apply,
+            )))
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, Annotation):
             return (
+                hash(self) == hash(other) and
                 self.options == other.options and
                 self.inherit == other.inherit and
                 self.apply == other.apply
@@ -59,22 +201,55 @@ class Annotation:
         ret = self.__eq__(other)
         return ret if ret is NotImplemented else not ret
 
-    def resolve(self, obj):
-        return self.__class__(
-            resolve_refs(obj, self.options),
-            inherit=self.inherit,
-            apply=self.apply,
+    def __repr__(self):
+        return '{}({!r}, inherit={!r}, apply={!r})'.format(
+            type(self).__name__, list(self.options), self.inherit, self.apply,
         )
 
+    @property
+    def per_instance(self):
+        """Whether any `Ref` in the options must be resolved per instance."""
+        return any(
+            functools.reduce(operator.getitem, path, self.options).per_instance
+            for path in self.refs
+        )
+
+    def resolve(self, obj):
+        if not self.refs:
+            return self
+        options = list(self.options)
+        for path in self.refs:
+            options = replace_ref(options, path, obj)
+        return self._make(tuple(options), self.inherit, self.apply, ())
+
     def merge(self, other):
         if self.inherit is False:
             return self
-        return self.__class__(
+        offset = len(self.options)
+        return self._make(
             self.options + other.options,
-            inherit=other.inherit,
-            apply=self.apply if self.apply is not None else other.apply,
+            other.inherit,
+            self.apply if self.apply is not None else other.apply,
+            self.refs + tuple((path[0] + offset, ) + path[1:] for path in other.refs),
         )
 
+
+def fingerprint(value):
+    """Return a hashable digest of `value` that is equal for equal values.
+
+    Unlike `freeze`, unhashable leaves are reduced to their type rather than
+    rejected, so the digest may collide but never raises.
+    """
+    if isinstance(value, dict):
+        return frozenset((key, fingerprint(each)) for key, each in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(fingerprint(each) for each in value)
+    try:
+        hash(value)
+    except TypeError:
+        return type(value)
+    return value
+
 def resolve_annotations(func, key, parent=None):
     annotations = (
         getattr(func, '__apispec__', {}).get(key, []) +
@@ -86,18 +261,40 @@ def resolve_annotations(func, key, parent=None):
         Annotation(),
     )
 
+
+MERGE_CACHE_SIZE = 4096
+
+_merge_cache = {}
+
+
 def merge_recursive(values):
-    return functools.reduce(_merge_recursive, values, {})
+    """Merge dicts recursively; values earlier in `values` take precedence.
+
+    Results share unchanged subtrees with `values` and are memoized by the
+    identity of `values`, so neither may be mutated afterwards.
+    """
+    values = tuple(values)
+    key = tuple(map(id, values))
+    cached = _merge_cache.get(key)
+    if cached is None:
+        if len(_merge_cache) >= MERGE_CACHE_SIZE:
+            _merge_cache.clear()
+        # Keep `values` alive so that their ids are not reused
+        merged = functools.reduce(_merge_recursive, values, {})
+        cached = _merge_cache[key] = (values, merged)
+    return cached[1]
+
 
 def _merge_recursive(child, parent):
     if isinstance(child, dict) or isinstance(parent, dict):
-        child = child or {}
-        parent = parent or {}
-        keys = set(child.keys()).union(parent.keys())
-        return {
-            key: _merge_recursive(child.get(key), parent.get(key))
-            for key in keys
-        }
+        if not parent:
+            return child or {}
+        if not child:
+            return parent
+        merged = dict(child)
+        for key, value in parent.items():
+            merged[key] = _merge_recursive(child[key], value) if key in child else value
+        return merged
     return child if child is not None else parent
 
 
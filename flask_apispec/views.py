@@ -1,17 +1,21 @@
 import flask.views
 
+from flask_apispec import utils
 from flask_apispec.annotations import activate
 
 
 def inherit(child, parents):
     child.__apispec__ = child.__dict__.get('__apispec__', {})
-    for key in ['args', 'schemas', 'docs']:
-        child.__apispec__.setdefault(key, []).extend(
-            annotation
-            for parent in parents
-            for annotation in getattr(parent, '__apispec__', {}).get(key, [])
-            if annotation not in child.__apispec__[key]
-        )
+    for key in ['args', 'schemas', 'docs', 'cache', 'etag', 'paginate', 'fields']:
+        annotations = child.__apispec__.setdefault(key, [])
+        # Hash lookups keep class creation linear in the depth of the hierarchy
+        seen = set(annotations)
+        for parent in parents:
+            for annotation in getattr(parent, '__apispec__', {}).get(key, []):
+                if annotation not in seen:
+                    seen.add(annotation)
+                    annotations.append(annotation)
+    utils.touch()
 
 
 class ResourceMeta(type):
@@ -1,14 +1,21 @@
 from flask import Response
 
 import importlib.metadata
+import inspect
+import itertools
+import time
 from collections.abc import Mapping
 
 import flask
+import marshmallow as ma
 import werkzeug
 from packaging.version import Version
 from webargs import flaskparser
 
-from flask_apispec import utils
+from flask_apispec import (
+    caching, fieldsets, metrics, pagination, parsing, utils
+)
+from flask_apispec.encoders import app_encoder, response_factory
 
 MARSHMALLOW_VERSION = Version(importlib.metadata.version("marshmallow"))
 
@@ -16,6 +23,9 @@ MARSHMALLOW_VERSION = Version(importlib.metadata.version("marshmallow"))
 class Wrapper:
     """Apply annotations to a view function.
 
+    Function views share one wrapper across requests, so wrappers should not
+    keep per-request state on `self`.
+
     :param func: View function to wrap
     :param instance: Optional instance or parent
     """
@@ -23,47 +33,439 @@ class Wrapper:
     def __init__(self, func, instance=None):
         self.func = func
         self.instance = instance
+        self.plan = get_plan(func, instance)
 
     def __call__(self, *args, **kwargs):
+        sink = get_runtime().metrics
+        if sink is not None:
+            return self.call_timed(sink, *args, **kwargs)
+        if self.plan.cache is not None:
+            return self.call_cached(*args, **kwargs)
         response = self.call_view(*args, **kwargs)
+        return self.make_response(response)
+
+    def call_timed(self, sink, *args, **kwargs):
+        """Serve the request while timing its phases, and pass the timings to
+        `sink` with the endpoint and status code.
+        """
+        token = metrics.start()
+        start = time.perf_counter()
+        status = 500
+        try:
+            if self.plan.cache is not None:
+                response = self.call_cached(*args, **kwargs)
+            else:
+                response = self.make_response(self.call_view(*args, **kwargs))
+            status = response.status_code
+            return response
+        except werkzeug.exceptions.HTTPException as error:
+            status = error.code
+            raise
+        finally:
+            timings = metrics.stop(token)
+            timings.add('total', start)
+            sink(flask.request.endpoint, status, timings)
+
+    def call_cached(self, *args, **kwargs):
+        """Serve the response cached for the parsed arguments of the request,
+        calling the view and caching its encoded response on a miss.
+        """
+        args, kwargs = self.parse_args(args, kwargs)
+        backend = get_runtime().cache
+        key = self.cache_key(args, kwargs)
+        response = caching.load(backend, key) if key is not None else None
+        if response is None:
+            response = self.make_response(self.call_func(args, kwargs))
+            if key is not None:
+                caching.save(backend, key, response, self.plan.cache['ttl'])
+        return caching.conditional(response)
+
+    def cache_key(self, args, kwargs):
+        # Leave the resource instance out of the key of method views
+        args = args[1:] if self.instance is not None else args
+        key = caching.make_key(self.plan.cache, args, kwargs)
+        if key is not None and self.plan.page is not None:
+            key += ':{}:{}'.format(*pagination.requested_page())
+        if key is not None and self.plan.fields is not None:
+            selection = fieldsets.selection()
+            if selection is not None:
+                key += ':' + ','.join(selection[0])
+        return key
+
+    def make_response(self, response):
         if isinstance(response, werkzeug.Response):
             return response
         rv, status_code, headers = unpack(response)
+        etag = self.plan.etag if status_code == 200 else None
+        token = None
+        if etag is not None and etag['version'] is not None:
+            # Skip marshalling if the client already has this version
+            token = etag['version'](rv)
+            if token is not None:
+                token = str(token)
+                if caching.matches(token):
+                    return caching.not_modified(token, headers)
         mv = self.marshal_result(rv, status_code)
-        response = packed(mv, status_code, headers)
-        return flask.current_app.make_response(response)
+        if isinstance(mv, werkzeug.Response):
+            # Same as `make_response` on the packed tuple, without its dispatch
+            if isinstance(status_code, (str, bytes)):
+                mv.status = status_code
+            elif status_code:
+                mv.status_code = status_code
+            if headers:
+                mv.headers.update(headers)
+            response = mv
+        else:
+            response = packed(mv, status_code, headers)
+            response = flask.current_app.make_response(response)
+        if etag is not None:
+            return caching.add_etag(response, token)
+        return response
 
     def call_view(self, *args, **kwargs):
-        config = flask.current_app.config
-        parser = config.get('APISPEC_WEBARGS_PARSER', flaskparser.parser)
-        annotation = utils.resolve_annotations(self.func, 'args', self.instance)
-        if annotation.apply is not False:
-            for option in annotation.options:
-                schema = utils.resolve_schema(option['args'], request=flask.request)
-                parsed = parser.parse(schema, location=option['kwargs']['location'])
-                if getattr(schema, 'many', False):
-                    args += tuple(parsed)
-                elif isinstance(parsed, Mapping):
-                    kwargs.update(parsed)
-                else:
-                    args += (parsed,)
+        args, kwargs = self.parse_args(args, kwargs)
+        return self.call_func(args, kwargs)
 
-        return self.func(*args, **kwargs)
+    def call_func(self, args, kwargs):
+        timings = metrics.current()
+        if timings is None:
+            return self.func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            timings.add('view', start)
+
+    def parse_args(self, args, kwargs):
+        """Parse the request with the args of the view and add the results to
+        the positional and keyword arguments of the view.
+        """
+        runtime = get_runtime()
+        parser = runtime.parser
+        request = flask.request
+        timings = metrics.current()
+        for schema, location, optional in self.plan.args:
+            if optional:
+                # Skip locations that cannot yield any arguments
+                check = runtime.empty_checks.get(location or parser.location)
+                if check is not None and check(request):
+                    continue
+            if timings is not None:
+                start = time.perf_counter()
+            if isinstance(schema, parsing.DictArgs):
+                # Dicts are loaded with the schema class of the parser, as
+                # webargs does when it is passed a dict
+                schema = parsing.schema_from_dict(
+                    *schema, schema_class=runtime.schema_class,
+                    cache=self.plan.cacheable)
+            schema = utils.resolve_schema(schema, request=request)
+            parsed = parser.parse(schema, location=location)
+            if timings is not None:
+                timings.add('parse', start, location or parser.location)
+            if getattr(schema, 'many', False):
+                args += tuple(parsed)
+            elif isinstance(parsed, Mapping):
+                kwargs.update(parsed)
+            else:
+                args += (parsed,)
+        if self.plan.page is not None:
+            pagination.parse(parser, self.plan.page)
+        if self.plan.fields is not None:
+            schemas = self.plan.schemas
+            schema = schemas.get(200, schemas.get('default'))
+            if schema and schema['schema']:
+                schema = utils.resolve_schema(schema['schema'], request=request)
+                fieldsets.parse(parser, self.plan.fields, schema)
+        return args, kwargs
 
     def marshal_result(self, result, status_code):
-        config = flask.current_app.config
-        format_response = config.get('APISPEC_FORMAT_RESPONSE', flask.jsonify) or identity
-        annotation = utils.resolve_annotations(self.func, 'schemas', self.instance)
-        schemas = utils.merge_recursive(annotation.options)
+        runtime = get_runtime()
+        format_response = runtime.format_response
+        schemas = self.plan.schemas
         schema = schemas.get(status_code, schemas.get('default'))
-        if schema and annotation.apply is not False:
-            schema = utils.resolve_schema(schema['schema'], request=flask.request)
-            dumped = schema.dump(result)
+        timings = metrics.current()
+        page = None
+        if self.plan.page is not None and status_code == 200:
+            # Load only the requested page of the result
+            page = pagination.get_page(result, *pagination.requested_page())
+            result = page.items
+        if schema:
+            stream = schema.get('stream')
+            selection = None
+            if self.plan.fields is not None and status_code == 200:
+                selection = fieldsets.selection()
+            if selection is not None:
+                schema = selection[1]
+            else:
+                schema = utils.resolve_schema(schema['schema'], request=flask.request)
+            if stream and page is None and runtime.stream:
+                return self.stream_result(result, schema, stream)
+            if timings is not None:
+                start = time.perf_counter()
+            if page is not None:
+                dumped = schema.dump(result, many=True)
+            else:
+                dumped = schema.dump(result)
             output = dumped.data if MARSHMALLOW_VERSION.major < 3 else dumped
+            if timings is not None:
+                dump_seconds = timings.add('dump', start)
         else:
             output = result
+        if page is not None:
+            items = len(output)
+            output = pagination.envelope(output, page, self.plan.page)
+
+        if timings is None:
+            response = format_response(output)  # type: Response
+        else:
+            start = time.perf_counter()
+            response = format_response(output)
+            timings.add('encode', start)
+            if schema:
+                if page is None:
+                    items = len(output) if schema.many else None
+                metrics.measure(
+                    timings, schema, items, response, dump_seconds, runtime.thresholds)
+        if page is not None:
+            return pagination.add_link(response, page, self.plan.page)
+        return response
+
+    def stream_result(self, result, schema, stream):
+        """Dump an iterable result in chunks of `APISPEC_STREAM_CHUNK_SIZE`
+        items and stream them as a JSON array, or as newline-delimited JSON if
+        `stream` is ``'ndjson'``.
+        """
+        runtime = get_runtime()
+        app = runtime.app
+        size = runtime.stream_chunk_size
+        encode = runtime.encode
+        ndjson = stream == 'ndjson'
+
+        def generate():
+            items = iter(result)
+            first = True
+            if not ndjson:
+                yield b'['
+            while True:
+                chunk = list(itertools.islice(items, size))
+                if not chunk:
+                    break
+                if schema.many:
+                    dumped = schema.dump(chunk)
+                else:
+                    dumped = [schema.dump(item) for item in chunk]
+                if ndjson:
+                    yield b''.join(encode(each) + b'\n' for each in dumped)
+                else:
+                    # Strip the brackets of the encoded chunk to splice it in
+                    yield (b'' if first else b',') + encode(dumped)[1:-1]
+                first = False
+            if not ndjson:
+                yield b']'
+
+        mimetype = 'application/x-ndjson' if ndjson else app.json.mimetype
+        response = flask.stream_with_context(generate())
+        return app.response_class(response, mimetype=mimetype)
+
+
+class ViewPlan:
+    """Annotations of a view function resolved once against its resource
+    class, so that serving a request does not need to resolve them again.
+
+    :param func: View function
+    :param instance: Optional instance or parent
+    """
+
+    def __init__(self, func, instance=None):
+        self.generation = utils.generation()
+        self.cacheable = not any(
+            annotation.per_instance
+            for obj in (func, instance)
+            for key in ('wrapper', 'args', 'schemas')
+            for annotation in getattr(obj, '__apispec__', {}).get(key, [])
+        )
+
+        annotation = utils.resolve_annotations(func, 'wrapper', instance)
+        wrapper = utils.merge_recursive(annotation.options)
+        default = AsyncWrapper if inspect.iscoroutinefunction(func) else Wrapper
+        self.wrapper_cls = wrapper.get('wrapper', default)
+
+        annotation = utils.resolve_annotations(func, 'args', instance)
+        args = parsing.merge_args(
+            (option['args'], option['kwargs']['location'])
+            for option in annotation.options
+        ) if annotation.apply is not False else []
+        self.args = [
+            (schema, location, parsing.is_optional(schema))
+            for schema, location in args
+        ]
+
+        annotation = utils.resolve_annotations(func, 'schemas', instance)
+        self.schemas = (
+            utils.merge_recursive(annotation.options)
+            if annotation.apply is not False else {}
+        )
+
+        annotation = utils.resolve_annotations(func, 'cache', instance)
+        self.cache = utils.merge_recursive(annotation.options) or None
+
+        annotation = utils.resolve_annotations(func, 'etag', instance)
+        self.etag = utils.merge_recursive(annotation.options) or None
+
+        annotation = utils.resolve_annotations(func, 'paginate', instance)
+        self.page = utils.merge_recursive(annotation.options) or None
 
-        return format_response(output)  # type: Response
+        annotation = utils.resolve_annotations(func, 'fields', instance)
+        self.fields = utils.merge_recursive(annotation.options) or None
+        self.wrapper = None
+
+    @property
+    def stale(self):
+        return self.generation != utils.generation()
+
+
+def get_wrapper(func, instance=None):
+    """Return the wrapper applying the annotations of a view function. Function
+    views reuse the wrapper stored on their plan.
+    """
+    plan = get_plan(func, instance)
+    if instance is not None:
+        return plan.wrapper_cls(func, instance)
+    if plan.wrapper is None:
+        plan.wrapper = plan.wrapper_cls(func)
+    return plan.wrapper
+
+
+def get_plan(func, instance=None):
+    """Return the compiled `ViewPlan` of a view function, building it on first
+    use and rebuilding it if annotations were added since.
+
+    Plans are cached per resource class, which also caches the values of any
+    `Ref`; plans that depend on per-instance refs are rebuilt for every
+    instance.
+    """
+    plans = getattr(func, '__apispec__', {}).setdefault('plans', {})
+    key = type(instance) if instance is not None else None
+    plan = plans.get(key)
+    if plan is None or plan.stale:
+        plan = ViewPlan(func, instance)
+        if plan.cacheable:
+            plans[key] = plan
+    return plan
+
+
+class AsyncWrapper(Wrapper):
+    """Apply annotations to a coroutine view function. Requests are parsed
+    before the view is awaited, and its result is marshalled once it
+    completes. Used by default for views defined with ``async def``.
+
+    :param func: Coroutine view function to wrap
+    :param instance: Optional instance or parent
+    """
+
+    async def __call__(self, *args, **kwargs):
+        sink = get_runtime().metrics
+        if sink is not None:
+            return await self.call_timed(sink, *args, **kwargs)
+        if self.plan.cache is not None:
+            return await self.call_cached(*args, **kwargs)
+        response = await self.call_view(*args, **kwargs)
+        return self.make_response(response)
+
+    async def call_timed(self, sink, *args, **kwargs):
+        token = metrics.start()
+        start = time.perf_counter()
+        status = 500
+        try:
+            if self.plan.cache is not None:
+                response = await self.call_cached(*args, **kwargs)
+            else:
+                response = self.make_response(await self.call_view(*args, **kwargs))
+            status = response.status_code
+            return response
+        except werkzeug.exceptions.HTTPException as error:
+            status = error.code
+            raise
+        finally:
+            timings = metrics.stop(token)
+            timings.add('total', start)
+            sink(flask.request.endpoint, status, timings)
+
+    async def call_view(self, *args, **kwargs):
+        args, kwargs = self.parse_args(args, kwargs)
+        return await self.call_func(args, kwargs)
+
+    async def call_func(self, args, kwargs):
+        timings = metrics.current()
+        if timings is None:
+            return await self.func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await self.func(*args, **kwargs)
+        finally:
+            timings.add('view', start)
+
+    async def call_cached(self, *args, **kwargs):
+        args, kwargs = self.parse_args(args, kwargs)
+        backend = get_runtime().cache
+        key = self.cache_key(args, kwargs)
+        response = caching.load(backend, key) if key is not None else None
+        if response is None:
+            response = self.make_response(await self.call_func(args, kwargs))
+            if key is not None:
+                caching.save(backend, key, response, self.plan.cache['ttl'])
+        return caching.conditional(response)
+
+
+class Runtime:
+    """Settings used by wrappers on every request, read once from the
+    application config.
+
+    :param app: Flask application
+    """
+
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.parser = config.get('APISPEC_WEBARGS_PARSER', flaskparser.parser)
+        # Schema class that webargs derives schemas from dicts of fields with
+        self.schema_class = getattr(self.parser, 'schema_class', ma.Schema)
+        self.empty_checks = parsing.empty_checks(self.parser)
+        self.metrics = metrics.make_sink(config.get('APISPEC_METRICS'))
+        self.thresholds = metrics.thresholds(config)
+        if self.metrics is None and self.thresholds:
+            self.metrics = metrics.discard
+        if 'APISPEC_FORMAT_RESPONSE' in config:
+            self.format_response = config['APISPEC_FORMAT_RESPONSE'] or identity
+        else:
+            self.format_response = response_factory(app)
+        # Custom formatters see whole results, so results are only streamed
+        # when they are encoded by flask-apispec
+        self.stream = 'APISPEC_FORMAT_RESPONSE' not in config
+        self.encode = app_encoder(app)
+        self.stream_chunk_size = config.get('APISPEC_STREAM_CHUNK_SIZE', 1000)
+        self.cache = config.get('APISPEC_CACHE')
+        if self.cache is None:
+            self.cache = caching.LRUCache(config.get('APISPEC_CACHE_SIZE', 1024))
+
+
+def get_runtime():
+    """Return the `Runtime` of the current application, reading it from the
+    config on first use.
+    """
+    app = flask.current_app
+    try:
+        return app.extensions['flask-apispec-runtime']
+    except KeyError:
+        return reload_runtime(app._get_current_object())
+
+
+def reload_runtime(app):
+    """Read the settings used by wrappers from the config of `app` again, e.g.
+    after changing `APISPEC_WEBARGS_PARSER` at runtime.
+    """
+    runtime = app.extensions['flask-apispec-runtime'] = Runtime(app)
+    return runtime
 
 
 def identity(value):
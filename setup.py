@@ -3,8 +3,8 @@ from setuptools import setup
 from setuptools import find_packages
 
 REQUIRES = [
-    'flask>=0.10.1',
-    'marshmallow>=3.0.0',
+    'flask>=2.2',
+    'marshmallow>=3.13.0',
     'webargs>=6.0.0',
     'apispec>=4.0.0',
 ]
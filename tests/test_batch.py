@@ -0,0 +1,151 @@
+import threading
+
+import flask
+
+import pytest
+from marshmallow import fields
+
+from flask_apispec import MethodResource, marshal_with, use_kwargs
+from flask_apispec.extension import FlaskApiSpec
+
+
+@pytest.fixture
+def app(app):
+    app.config['APISPEC_BATCH_URL'] = '/batch/'
+    return app
+
+
+@pytest.fixture
+def views(app, models, schemas):
+    threads = []
+
+    @app.route('/bands/<name>/')
+    @use_kwargs({'genre': fields.Str()}, location='query')
+    @marshal_with(schemas.BandSchema)
+    def get_band(name, **kwargs):
+        threads.append(threading.get_ident())
+        return models.Band(name, kwargs.get('genre', 'rock'))
+
+    class BandsResource(MethodResource):
+        @use_kwargs({'name': fields.Str(required=True)}, location='json')
+        @marshal_with(schemas.BandSchema, code=201)
+        def post(self, **kwargs):
+            return models.Band(kwargs['name'], 'rock'), 201
+
+    @app.route('/headers/')
+    def get_headers():
+        return {'token': flask.request.headers.get('X-Token')}
+
+    @app.route('/error/')
+    def get_error():
+        raise ValueError('oops')
+
+    app.add_url_rule('/bands/', view_func=BandsResource.as_view('bands'))
+    FlaskApiSpec(app)
+    return threads
+
+
+class TestBatch:
+
+    def test_batch(self, app, client, views):
+        res = client.post_json('/batch/', [
+            {'path': '/bands/queen/', 'query': {'genre': 'opera'}},
+            {'method': 'POST', 'path': '/bands/', 'body': {'name': 'slowdive'}},
+            {'path': '/bands/'},
+            {'path': '/missing/'},
+        ])
+        assert [each['status'] for each in res.json] == [200, 201, 405, 404]
+        assert res.json[0]['body'] == {'name': 'queen', 'genre': 'opera'}
+        assert res.json[0]['headers']['Content-Type'] == 'application/json'
+        assert res.json[1]['body'] == {'name': 'slowdive', 'genre': 'rock'}
+
+    def test_validation_errors(self, app, client, views):
+        res = client.post_json('/batch/', [
+            {'method': 'POST', 'path': '/bands/', 'body': {}},
+        ])
+        assert res.json[0]['status'] == 422
+        res = client.post_json('/batch/', [{'method': 'GET'}], expect_errors=True)
+        assert res.status_code == 422
+
+    def test_headers(self, app, client, views):
+        res = client.post_json('/batch/', [
+            {'path': '/headers/'},
+            {'path': '/headers/', 'headers': {'X-Token': 'child'}},
+        ], headers={'X-Token': 'parent'})
+        assert [each['body'] for each in res.json] == [
+            {'token': 'parent'}, {'token': 'child'},
+        ]
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_app_context_isolated(self, app, client, views, workers):
+        app.config['APISPEC_BATCH_WORKERS'] = workers
+        teardowns = []
+
+        @app.before_request
+        def load_user():
+            if 'user' not in flask.g:
+                flask.g.user = flask.request.headers.get('X-User')
+
+        @app.teardown_appcontext
+        def teardown(error):
+            teardowns.append(flask.g.get('user'))
+
+        @app.route('/user/')
+        def get_user():
+            return {'user': flask.g.user}
+
+        res = client.post_json('/batch/', [
+            {'path': '/user/', 'headers': {'X-User': 'alice'}},
+            {'path': '/user/', 'headers': {'X-User': 'bob'}},
+        ], headers={'X-User': 'admin'})
+        assert [each['body'] for each in res.json] == [{'user': 'alice'}, {'user': 'bob'}]
+        assert sorted(teardowns) == ['admin', 'alice', 'bob']
+
+    def test_unhandled_error(self, app, client, views):
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+        res = client.post_json('/batch/', [{'path': '/error/'}, {'path': '/bands/a/'}])
+        assert [each['status'] for each in res.json] == [500, 200]
+
+    def test_nested(self, app, client, views):
+        res = client.post_json('/batch/', [
+            {'method': 'POST', 'path': '/batch/', 'body': []},
+        ])
+        assert res.json[0]['status'] == 400
+
+    def test_max_size(self, app, client, views):
+        app.config['APISPEC_BATCH_MAX_SIZE'] = 2
+        res = client.post_json(
+            '/batch/', [{'path': '/bands/a/'}] * 3, expect_errors=True)
+        assert res.status_code == 413
+
+    def test_workers(self, app, client, views):
+        app.config['APISPEC_BATCH_WORKERS'] = 4
+        names = [str(idx) for idx in range(8)]
+        res = client.post_json('/batch/', [
+            {'path': '/bands/{}/'.format(name)} for name in names])
+        assert [each['body']['name'] for each in res.json] == names
+        assert threading.get_ident() not in views
+
+    def test_workers_serial_with_side_effects(self, app, client, views):
+        app.config['APISPEC_BATCH_WORKERS'] = 4
+        client.post_json('/batch/', [
+            {'path': '/bands/a/'},
+            {'method': 'POST', 'path': '/bands/', 'body': {'name': 'b'}},
+        ])
+        assert views == [threading.get_ident()]
+
+    def test_documented(self, app, client, views):
+        spec = client.get('/swagger/').json
+        operation = spec['paths']['/batch/']['post']
+        assert operation['tags'] == ['batch']
+        assert operation['parameters'][0]['in'] == 'body'
+        assert operation['parameters'][0]['schema']['items'] == {
+            '$ref': '#/definitions/BatchRequest',
+        }
+        assert 'BatchResponse' in spec['definitions']
+
+    def test_disabled(self, app, client):
+        app.config['APISPEC_BATCH_URL'] = None
+        FlaskApiSpec(app)
+        assert client.post_json('/batch/', [], expect_errors=True).status_code == 404
+        assert '/batch/' not in client.get('/swagger/').json['paths']
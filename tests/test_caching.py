@@ -0,0 +1,262 @@
+import itertools
+
+import marshmallow as ma
+import pytest
+from marshmallow import fields
+
+from flask_apispec import (
+    MethodResource, cache_response, conditional_response, marshal_with, use_kwargs
+)
+from flask_apispec.caching import LRUCache, SerializingCache
+from flask_apispec.extension import FlaskApiSpec
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def calls():
+    return itertools.count()
+
+
+@pytest.fixture
+def view(app, calls, models, schemas):
+    @app.route('/bands/')
+    @cache_response(ttl=60)
+    @use_kwargs({'name': fields.Str()}, location='query')
+    @marshal_with(schemas.BandSchema)
+    def get_band(**kwargs):
+        return models.Band(kwargs.get('name'), str(next(calls)))
+    return get_band
+
+
+class TestLRUCache:
+
+    def test_expires(self):
+        clock = Clock()
+        cache = LRUCache(timer=clock)
+        cache.set('band', 'queen', 10)
+        cache.set('album', 'jazz', None)
+        clock.now = 9
+        assert cache.get('band') == 'queen'
+        clock.now = 10
+        assert cache.get('band') is None
+        assert cache.get('album') == 'jazz'
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('first', 1, None)
+        cache.set('second', 2, None)
+        cache.get('first')
+        cache.set('third', 3, None)
+        assert cache.get('second') is None
+        assert cache.get('first') == 1
+        assert len(cache) == 2
+
+
+class TestSerializingCache:
+
+    def test_shared_store(self):
+        clock = Clock()
+        store = {}
+        SerializingCache(store, timer=clock).set('band', ('queen', [1]), 10)
+        cache = SerializingCache(store, timer=clock)
+        assert cache.get('band') == ('queen', [1])
+        assert isinstance(store['band'][1], bytes)
+        clock.now = 10
+        assert cache.get('band') is None
+        assert store == {}
+
+
+class TestCacheResponse:
+
+    def test_cached_per_args(self, app, client, view):
+        assert client.get('/bands/', {'name': 'queen'}).json == {
+            'name': 'queen', 'genre': '0'}
+        assert client.get('/bands/', {'name': 'queen'}).json == {
+            'name': 'queen', 'genre': '0'}
+        assert client.get('/bands/', {'name': 'slowdive'}).json == {
+            'name': 'slowdive', 'genre': '1'}
+
+    def test_etag(self, app, client, view):
+        res = client.get('/bands/', {'name': 'queen'})
+        etag = res.headers['ETag']
+        res = client.get('/bands/', {'name': 'queen'}, headers={'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.body == b''
+        res = client.get('/bands/', {'name': 'slowdive'}, headers={'If-None-Match': etag})
+        assert res.status_code == 200
+
+    def test_expires(self, app, client, view):
+        clock = Clock()
+        app.config['APISPEC_CACHE'] = LRUCache(timer=clock)
+        assert client.get('/bands/').json['genre'] == '0'
+        clock.now = 59
+        assert client.get('/bands/').json['genre'] == '0'
+        clock.now = 60
+        assert client.get('/bands/').json['genre'] == '1'
+
+    def test_backend(self, app, client, view):
+        app.config['APISPEC_CACHE'] = SerializingCache()
+        assert client.get('/bands/').json['genre'] == '0'
+        assert client.get('/bands/').json['genre'] == '0'
+        assert list(app.config['APISPEC_CACHE'].store) == ['get_band:[[], {}]']
+
+    def test_custom_key(self, app, client, calls):
+        @app.route('/bands/')
+        @cache_response(key=lambda **kwargs: kwargs.get('name', '').lower())
+        @use_kwargs({'name': fields.Str()}, location='query')
+        def get_band(**kwargs):
+            return {'calls': next(calls)}
+
+        assert client.get('/bands/', {'name': 'Queen'}).json == {'calls': 0}
+        assert client.get('/bands/', {'name': 'queen'}).json == {'calls': 0}
+
+    def test_errors_not_cached(self, app, client, calls):
+        @app.route('/bands/')
+        @cache_response()
+        def get_band():
+            return {'calls': next(calls)}, 404
+
+        assert client.get('/bands/', expect_errors=True).json == {'calls': 0}
+        assert client.get('/bands/', expect_errors=True).json == {'calls': 1}
+
+    def test_unsafe_methods_not_cached(self, app, client, calls):
+        @app.route('/bands/', methods=['POST'])
+        @cache_response()
+        def post_band():
+            return {'calls': next(calls)}
+
+        assert client.post('/bands/').json == {'calls': 0}
+        assert client.post('/bands/').json == {'calls': 1}
+
+    def test_method_resource(self, app, client, calls, models, schemas):
+        @cache_response()
+        class BandResource(MethodResource):
+            @use_kwargs({'name': fields.Str()}, location='query')
+            @marshal_with(schemas.BandSchema)
+            def get(self, **kwargs):
+                return models.Band(kwargs.get('name'), str(next(calls)))
+
+        app.add_url_rule('/bands/', view_func=BandResource.as_view('band'))
+        assert client.get('/bands/', {'name': 'queen'}).json['genre'] == '0'
+        assert client.get('/bands/', {'name': 'queen'}).json['genre'] == '0'
+
+    def test_async_view(self, app, client, calls):
+        pytest.importorskip('asgiref')
+
+        @app.route('/bands/')
+        @cache_response()
+        async def get_band():
+            return {'calls': next(calls)}
+
+        assert client.get('/bands/').json == {'calls': 0}
+        assert client.get('/bands/').json == {'calls': 0}
+
+    def test_documented(self, app, view):
+        docs = FlaskApiSpec(app)
+        docs.register(view)
+        operation = docs.spec.to_dict()['paths']['/bands/']['get']
+        assert operation['x-cache-ttl'] == 60
+        assert operation['responses']['304'] == {'description': 'Not modified'}
+
+
+class TestConditionalResponse:
+
+    def test_checksum(self, app, client, models, schemas):
+        @app.route('/bands/')
+        @conditional_response()
+        @marshal_with(schemas.BandSchema)
+        def get_band():
+            return models.Band('queen', 'rock')
+
+        res = client.get('/bands/')
+        etag = res.headers['ETag']
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+        assert client.get('/bands/').headers['ETag'] == etag
+        res = client.get('/bands/', headers={'If-None-Match': etag})
+        assert res.status_code == 304
+        assert res.body == b''
+        assert res.headers['ETag'] == etag
+        res = client.get('/bands/', headers={'If-None-Match': '"other"'})
+        assert res.status_code == 200
+
+    def test_version_skips_marshalling(self, app, client, models):
+        dumped = []
+
+        class BandSchema(ma.Schema):
+            name = ma.fields.Str()
+
+            @ma.post_dump
+            def count(self, data, **kwargs):
+                dumped.append(data)
+                return data
+
+        @app.route('/bands/')
+        @conditional_response(version=lambda band: band.genre)
+        @marshal_with(BandSchema)
+        def get_band():
+            return models.Band('queen', 'v7')
+
+        res = client.get('/bands/')
+        assert res.headers['ETag'] == '"v7"'
+        assert len(dumped) == 1
+        res = client.get('/bands/', headers={'If-None-Match': '"v7"'})
+        assert res.status_code == 304
+        assert res.headers['ETag'] == '"v7"'
+        assert len(dumped) == 1
+
+    @pytest.mark.parametrize('version', [None, lambda band: 'v1'])
+    def test_unsafe_methods_not_replaced(self, app, client, calls, models, schemas,
+                                         version):
+        @app.route('/bands/', methods=['PUT'])
+        @conditional_response(version=version)
+        @marshal_with(schemas.BandSchema)
+        def put_band():
+            next(calls)
+            return models.Band('queen', 'rock')
+
+        etag = client.put('/bands/').headers['ETag']
+        res = client.put('/bands/', headers={'If-None-Match': etag})
+        assert res.status_code == 200
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+        assert res.headers['ETag'] == etag
+        assert next(calls) == 2
+
+    def test_errors_not_tagged(self, app, client):
+        @app.route('/bands/')
+        @conditional_response()
+        def get_band():
+            return {'message': 'not found'}, 404
+
+        res = client.get('/bands/', expect_errors=True)
+        assert res.status_code == 404
+        assert 'ETag' not in res.headers
+
+    def test_method_resource(self, app, client, models, schemas):
+        @conditional_response()
+        class BandResource(MethodResource):
+            @marshal_with(schemas.BandSchema)
+            def get(self):
+                return models.Band('queen', 'rock')
+
+        app.add_url_rule('/bands/', view_func=BandResource.as_view('band'))
+        etag = client.get('/bands/').headers['ETag']
+        assert client.get('/bands/', headers={'If-None-Match': etag}).status_code == 304
+
+    def test_documented(self, app, models):
+        @app.route('/bands/')
+        @conditional_response()
+        def get_band():
+            return {}
+
+        docs = FlaskApiSpec(app)
+        docs.register(get_band)
+        operation = docs.spec.to_dict()['paths']['/bands/']['get']
+        assert operation['responses']['304'] == {'description': 'Not modified'}
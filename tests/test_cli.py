@@ -0,0 +1,50 @@
+import json
+
+import pytest
+import yaml
+
+from flask_apispec import doc
+from flask_apispec.extension import FlaskApiSpec
+
+
+@pytest.fixture
+def docs(app):
+    docs = FlaskApiSpec(app)
+
+    @app.route('/bands/<int:band_id>/')
+    @doc(tags=['band'])
+    def get_band(band_id):
+        return 'queen'
+    docs.register(get_band)
+    return docs
+
+@pytest.fixture
+def runner(app):
+    return app.test_cli_runner()
+
+class TestBuild:
+
+    def test_build_stdout(self, docs, runner):
+        result = runner.invoke(args=['apispec', 'build'])
+        assert result.exit_code == 0
+        assert json.loads(result.output) == docs.spec.to_dict()
+
+    def test_build_json(self, docs, runner, tmp_path):
+        output = tmp_path / 'swagger.json'
+        result = runner.invoke(args=['apispec', 'build', '-o', str(output)])
+        assert result.exit_code == 0
+        assert json.loads(output.read_text()) == docs.spec.to_dict()
+
+    def test_build_yaml(self, docs, runner, tmp_path):
+        output = tmp_path / 'swagger.yaml'
+        result = runner.invoke(args=['apispec', 'build', '-o', str(output)])
+        assert result.exit_code == 0
+        assert yaml.safe_load(output.read_text()) == docs.spec.to_dict()
+
+    def test_build_static_spec_path(self, app, runner, tmp_path):
+        output = tmp_path / 'swagger.json'
+        app.config['APISPEC_STATIC_SPEC_PATH'] = str(output)
+        docs = FlaskApiSpec(app)
+        result = runner.invoke(args=['apispec', 'build'])
+        assert result.exit_code == 0
+        assert json.loads(output.read_text()) == docs.spec.to_dict()
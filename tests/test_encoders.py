@@ -0,0 +1,78 @@
+import datetime
+import json
+
+import pytest
+from marshmallow import fields
+
+from flask_apispec import marshal_with, use_kwargs
+from flask_apispec.encoders import BACKENDS, get_encoder
+from flask_apispec.extension import FlaskApiSpec
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    if request.param != 'json':
+        pytest.importorskip(request.param)
+    return request.param
+
+class TestEncoders:
+
+    def test_encode(self, backend):
+        encode = get_encoder(backend)
+        data = {'name': 'queen', 'albums': [1, 2.5, None, True], 'city': 'zürich'}
+        assert json.loads(encode(data)) == data
+
+    def test_encode_default(self, backend):
+        encode = get_encoder(backend, default=lambda obj: obj.isoformat())
+        assert json.loads(encode({'formed': datetime.date(1970, 1, 1)})) == {
+            'formed': '1970-01-01',
+        }
+
+    def test_encode_auto(self):
+        assert json.loads(get_encoder('auto')({'name': 'queen'})) == {'name': 'queen'}
+
+    def test_encode_callable(self):
+        def encode(obj):
+            return b'{}'
+        assert get_encoder(encode) is encode
+
+    def test_marshal_with_encoder(self, app, client, backend, models, schemas):
+        app.config['APISPEC_JSON_ENCODER'] = backend
+
+        @app.route('/')
+        @marshal_with(schemas.BandSchema)
+        def view():
+            return models.Band('queen', 'rock'), 201
+        res = client.get('/')
+        assert res.status_code == 201
+        assert res.content_type == 'application/json'
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+
+    def test_stream_encoder(self, app, client, backend, models, schemas):
+        app.config['APISPEC_JSON_ENCODER'] = backend
+        app.config['APISPEC_STREAM_CHUNK_SIZE'] = 2
+        bands = [models.Band('band {}'.format(idx), 'rock') for idx in range(5)]
+
+        @app.route('/buffered/')
+        @marshal_with(schemas.BandSchema(many=True))
+        def buffered():
+            return bands
+
+        @app.route('/streamed/')
+        @marshal_with(schemas.BandSchema(many=True), stream=True)
+        def streamed():
+            return iter(bands)
+        assert client.get('/streamed/').body == client.get('/buffered/').body
+
+    def test_swagger_encoder(self, app, client, backend, schemas):
+        app.config['APISPEC_JSON_ENCODER'] = backend
+        docs = FlaskApiSpec(app)
+
+        @app.route('/bands/<int:band_id>/')
+        @use_kwargs({'name': fields.Str()}, location='query')
+        @marshal_with(schemas.BandSchema, code=201)
+        def get_band(band_id):
+            return {'name': 'queen'}
+        docs.register(get_band)
+        res = client.get('/swagger/')
+        assert res.json == json.loads(json.dumps(docs.spec.to_dict()))
@@ -1,7 +1,13 @@
+import gzip
+import json
+
+import marshmallow as ma
 import pytest
-from flask import Blueprint
+from flask import Blueprint, Flask
+from marshmallow import fields
+from werkzeug.routing import Rule
 
-from flask_apispec import doc
+from flask_apispec import doc, marshal_with, use_kwargs
 from flask_apispec.extension import FlaskApiSpec
 from flask_apispec.views import MethodResource
 
@@ -45,6 +51,10 @@ class TestExtension:
         docs.register(BandResource, endpoint='band')
         assert '/bands/{band_id}/' in docs.spec._paths
 
+    def test_converters_share_route_index(self, app, docs):
+        assert docs.view_converter.routes is docs.routes
+        assert docs.resource_converter.routes is docs.routes
+
     def test_register_resource_with_constructor_args(self, app, docs):
         @doc(tags=['band'])
         class BandResource(MethodResource):
@@ -96,3 +106,205 @@ class TestExtension:
         assert docs.spec.title == 'test-extension'
         assert docs.spec.version == '2.1'
         assert docs.spec.openapi_version == '2.0'
+
+    def test_reload_runtime(self, app, docs, client):
+        @app.route('/bands/')
+        @use_kwargs({'name': fields.Str()}, location='query')
+        def get_bands(**kwargs):
+            return kwargs
+        assert client.get('/bands/', {'name': 'queen'}).json == {'name': 'queen'}
+        app.config['APISPEC_FORMAT_RESPONSE'] = None
+        docs.reload_runtime()
+        assert client.get('/bands/', {'name': 'queen'}).json == {'name': 'queen'}
+        assert app.extensions['flask-apispec-runtime'].format_response({}) == {}
+
+    def test_serve_swagger_etag(self, app, docs, client):
+        res = client.get('/swagger/')
+        assert res.headers['ETag']
+        assert res.headers['Cache-Control'] == 'no-cache'
+        res = client.get('/swagger/', headers={'If-None-Match': res.headers['ETag']})
+        assert res.status_code == 304
+        assert res.body == b''
+
+    def test_serve_swagger_max_age(self, app, docs, client):
+        app.config['APISPEC_SWAGGER_MAX_AGE'] = 60
+        res = client.get('/swagger/')
+        assert 'max-age=60' in res.headers['Cache-Control']
+
+    def test_serve_swagger_invalidated_on_register(self, app, docs, client):
+        @app.route('/bands/<int:band_id>/')
+        @doc(tags=['band'])
+        def get_band(band_id):
+            return 'queen'
+
+        etag = client.get('/swagger/').headers['ETag']
+        docs.register(get_band)
+
+        res = client.get('/swagger/', headers={'If-None-Match': etag})
+        assert res.status_code == 200
+        assert '/bands/{band_id}/' in res.json['paths']
+
+    def test_serve_swagger_gzip(self, app, docs):
+        app.config['APISPEC_SWAGGER_COMPRESS'] = True
+        client = app.test_client()
+        plain = client.get('/swagger/', headers={'Accept-Encoding': 'identity'})
+        res = client.get('/swagger/', headers={'Accept-Encoding': 'gzip'})
+        assert res.headers['Content-Encoding'] == 'gzip'
+        assert res.headers['Vary'] == 'Accept-Encoding'
+        assert res.headers['ETag'] != plain.headers['ETag']
+        assert json.loads(gzip.decompress(res.data)) == plain.json
+
+class TestLazyExtension:
+
+    @pytest.fixture
+    def make_app(self):
+        def make_app(lazy):
+            app = Flask(__name__)
+            app.config['APISPEC_LAZY'] = lazy
+            docs = FlaskApiSpec(app)
+
+            @app.route('/bands/<int:band_id>/')
+            @doc(tags=['band'])
+            @use_kwargs({'name': fields.Str()}, location='query')
+            def get_band(band_id):
+                return 'queen'
+
+            @doc(tags=['band'])
+            class BandResource(MethodResource):
+                def get(self, **kwargs):
+                    return 'slowdive'
+
+            app.add_url_rule('/resources/<band_id>/', view_func=BandResource.as_view('band'))
+            docs.register(get_band)
+            docs.register(BandResource, endpoint='band')
+            return app, docs
+        return make_app
+
+    def test_lazy_register(self, make_app):
+        app, docs = make_app(lazy=True)
+        assert docs.spec._paths == {}
+        spec = docs.spec.to_dict()
+        assert list(spec['paths']) == ['/bands/{band_id}/', '/resources/{band_id}/']
+
+    def test_lazy_identical_output(self, make_app):
+        lazy_app, _ = make_app(lazy=True)
+        eager_app, _ = make_app(lazy=False)
+        lazy = lazy_app.test_client().get('/swagger/')
+        eager = eager_app.test_client().get('/swagger/')
+        assert lazy.data == eager.data
+
+    def test_lazy_register_after_serving(self, make_app):
+        app, docs = make_app(lazy=True)
+        client = app.test_client()
+        client.get('/swagger/')
+
+        @doc(tags=['album'])
+        def get_album():
+            return 'loveless'
+        app.view_functions['get_album'] = get_album
+        app.url_map.add(Rule('/albums/', endpoint='get_album', methods=['GET']))
+        docs.register(get_album)
+
+        res = client.get('/swagger/')
+        assert '/albums/' in res.json['paths']
+
+    def test_lazy_register_existing_resources(self, make_app):
+        app, docs = make_app(lazy=True)
+        docs.register_existing_resources()
+        assert '/bands/{band_id}/' in docs.spec.to_dict()['paths']
+
+    def test_static_spec(self, make_app, tmp_path):
+        output = tmp_path / 'swagger.json'
+        output.write_text('{"paths": {}}')
+        app = Flask(__name__)
+        app.config['APISPEC_STATIC_SPEC_PATH'] = str(output)
+        docs = FlaskApiSpec(app)
+
+        @app.route('/bands/<int:band_id>/')
+        def get_band(band_id):
+            return 'queen'
+        docs.register(get_band)
+
+        res = app.test_client().get('/swagger/')
+        assert res.json == {'paths': {}}
+        assert res.headers['ETag']
+        assert docs.spec._paths == {}
+
+
+class AlbumSchema(ma.Schema):
+    title = fields.Str()
+
+
+class ArtistSchema(ma.Schema):
+    name = fields.Str()
+    albums = fields.Nested(AlbumSchema, many=True)
+
+
+class TestParallelExtension:
+
+    def make_app(self, processes, schema=ArtistSchema):
+        app = Flask(__name__)
+        app.config['APISPEC_PROCESSES'] = processes
+        docs = FlaskApiSpec()
+
+        for idx in range(12):
+            @doc(tags=['artist'], description='artist {}'.format(idx))
+            @use_kwargs({'name': fields.Str(), 'page': fields.Int()}, location='query')
+            @use_kwargs(AlbumSchema, location='json')
+            @marshal_with(schema)
+            @marshal_with(AlbumSchema(many=True), code=201)
+            def view(artist_id, **kwargs):
+                return {}
+            view.__name__ = 'artist_{}'.format(idx)
+            app.add_url_rule('/artists/{}/<int:artist_id>/'.format(idx), view_func=view,
+                             methods=['GET', 'POST'])
+            docs.register(view)
+
+        @doc(tags=['album'])
+        class AlbumResource(MethodResource):
+            @marshal_with(AlbumSchema)
+            def get(self, **kwargs):
+                return {}
+
+            @use_kwargs(AlbumSchema)
+            def put(self, **kwargs):
+                return {}
+
+        app.add_url_rule('/albums/<int:album_id>/', view_func=AlbumResource.as_view('album'))
+        docs.register(AlbumResource, endpoint='album')
+        docs.init_app(app)
+        return app, docs
+
+    def test_parallel_identical_output(self):
+        _, serial = self.make_app(processes=1)
+        _, parallel = self.make_app(processes=3)
+        assert json.dumps(parallel.spec.to_dict()) == json.dumps(serial.spec.to_dict())
+
+    def test_parallel_register_existing_resources(self):
+        serial_app, serial = self.make_app(processes=1)
+        parallel_app, parallel = self.make_app(processes=3)
+        serial.register_existing_resources()
+        parallel.register_existing_resources()
+        assert json.dumps(parallel.spec.to_dict()) == json.dumps(serial.spec.to_dict())
+
+    def test_parallel_register_after_init(self):
+        app, docs = self.make_app(processes=3)
+
+        @marshal_with(ArtistSchema)
+        def get_artists():
+            return []
+        app.add_url_rule('/artists/', view_func=get_artists)
+        docs.register(get_artists)
+        spec = docs.spec.to_dict()
+        assert list(spec['definitions']) == ['Album', 'Artist']
+        assert '/artists/' in spec['paths']
+
+    def test_parallel_fallback(self):
+        class LocalSchema(ma.Schema):
+            name = fields.Str()
+
+        _, serial = self.make_app(processes=1, schema=LocalSchema)
+        with pytest.warns(UserWarning, match='serially'):
+            _, parallel = self.make_app(processes=3, schema=LocalSchema)
+        assert json.dumps(parallel.spec.to_dict()) == json.dumps(serial.spec.to_dict())
+
@@ -0,0 +1,179 @@
+import marshmallow as ma
+import pytest
+
+from flask_apispec import MethodResource, cache_response, marshal_with, sparse_fields
+from flask_apispec.extension import FlaskApiSpec
+from flask_apispec.fieldsets import select
+
+
+class OwnerSchema(ma.Schema):
+    name = ma.fields.Str()
+    email = ma.fields.Str()
+
+
+class PetSchema(ma.Schema):
+    name = ma.fields.Str()
+    category = ma.fields.Str()
+    owner = ma.fields.Nested(OwnerSchema)
+    friends = ma.fields.List(ma.fields.Nested(OwnerSchema))
+    password = ma.fields.Str(load_only=True)
+    summary = ma.fields.Method('get_summary')
+
+    def get_summary(self, obj):
+        obj['summaries'] += 1
+        return 'summary'
+
+
+@pytest.fixture
+def pet():
+    return {
+        'name': 'felix',
+        'category': 'cat',
+        'owner': {'name': 'sam', 'email': 'sam@example.com'},
+        'friends': [{'name': 'alex', 'email': 'alex@example.com'}],
+        'password': 'secret',
+        'summaries': 0,
+    }
+
+
+@pytest.fixture
+def view(app, pet):
+    @app.route('/pets/')
+    @sparse_fields()
+    @marshal_with(PetSchema(many=True))
+    def list_pets():
+        return [pet]
+    return list_pets
+
+
+class TestSelect:
+
+    def test_nested(self, pet):
+        schema = select(PetSchema(), ['owner.name', 'friends.email', 'name'])
+        assert schema.dump(pet) == {
+            'name': 'felix',
+            'owner': {'name': 'sam'},
+            'friends': [{'email': 'alex@example.com'}],
+        }
+
+    @pytest.mark.parametrize('names', [
+        ['color'], ['password'], ['name.first'], ['owner.phone'], ['friends.phone'],
+    ])
+    def test_unknown(self, names):
+        with pytest.raises(ValueError):
+            select(PetSchema(), names)
+
+    @pytest.mark.parametrize('declared', [
+        PetSchema(only=('name', 'owner.name', 'friends.name')),
+        PetSchema(exclude=('owner.email', 'friends.email', 'category')),
+    ])
+    def test_keeps_declared_restrictions(self, pet, declared):
+        schema = select(declared, ['owner', 'friends'])
+        assert schema.dump(pet) == {
+            'owner': {'name': 'sam'}, 'friends': [{'name': 'alex'}],
+        }
+        with pytest.raises(ValueError):
+            select(declared, ['owner.email'])
+        with pytest.raises(ValueError):
+            select(declared, ['category'])
+
+    def test_keeps_declared_options(self):
+        declared = PetSchema(
+            many=True, context={'user': 'sam'}, partial=True, unknown=ma.EXCLUDE,
+            load_only=('category', ), exclude=('friends', ),
+        )
+        schema = select(declared, ['name', 'owner'])
+        assert schema.many
+        assert schema.context == {'user': 'sam'}
+        assert schema.partial is True
+        assert schema.unknown == ma.EXCLUDE
+        assert schema.load_only == {'category'}
+        assert 'friends' not in schema.fields
+
+    def test_declared_schema_unchanged(self, pet):
+        declared = PetSchema()
+        select(declared, ['owner.name'])
+        assert declared.dump(pet)['owner'] == pet['owner']
+
+    def test_cached(self):
+        schema = PetSchema(many=True)
+        assert select(schema, ['name', 'owner']) is select(schema, ['owner', 'name'])
+        assert select(schema, ['name']).many
+
+
+class TestSparseFields:
+
+    def test_selected(self, app, client, view, pet):
+        res = client.get('/pets/', {'fields': 'name,owner.name'})
+        assert res.json == [{'name': 'felix', 'owner': {'name': 'sam'}}]
+        assert pet['summaries'] == 0
+
+    def test_all_fields_by_default(self, app, client, view, pet):
+        res = client.get('/pets/')
+        assert set(res.json[0]) == {'name', 'category', 'owner', 'friends', 'summary'}
+        assert pet['summaries'] == 1
+
+    def test_declared_nested_only(self, app, client, pet):
+        @app.route('/pets/')
+        @sparse_fields()
+        @marshal_with(PetSchema(only=('name', 'owner.name')))
+        def get_pet():
+            return pet
+
+        assert client.get('/pets/', {'fields': 'owner'}).json == {
+            'owner': {'name': 'sam'},
+        }
+
+    def test_invalid(self, app, client, view):
+        @app.errorhandler(422)
+        def handle_error(error):
+            return error.data['messages'], 422
+
+        res = client.get('/pets/', {'fields': 'name,password'}, expect_errors=True)
+        assert res.status_code == 422
+        assert res.json == {'query': {'fields': ['Unknown fields: password.']}}
+
+    def test_custom_arg(self, app, client, pet):
+        @app.route('/pets/')
+        @sparse_fields(arg='only')
+        @marshal_with(PetSchema)
+        def get_pet():
+            return pet
+
+        assert client.get('/pets/', {'only': 'category'}).json == {'category': 'cat'}
+
+    def test_resource(self, app, client, pet):
+        @sparse_fields()
+        @marshal_with(PetSchema)
+        class PetResource(MethodResource):
+            def get(self):
+                return pet
+
+        app.add_url_rule('/pets/', view_func=PetResource.as_view('pet'))
+        assert client.get('/pets/', {'fields': 'name'}).json == {'name': 'felix'}
+
+    def test_cached_per_selection(self, app, client, pet):
+        @app.route('/pets/')
+        @cache_response(ttl=60)
+        @sparse_fields()
+        @marshal_with(PetSchema)
+        def get_pet():
+            return pet
+
+        assert client.get('/pets/', {'fields': 'name'}).json == {'name': 'felix'}
+        assert client.get('/pets/', {'fields': 'category'}).json == {'category': 'cat'}
+        assert client.get('/pets/', {'fields': 'owner.email'}).json == {
+            'owner': {'email': 'sam@example.com'},
+        }
+        assert client.get('/pets/', {'fields': 'owner.name'}).json == {
+            'owner': {'name': 'sam'},
+        }
+
+    def test_documented(self, app, view):
+        docs = FlaskApiSpec(app)
+        docs.register(view)
+        operation = docs.spec.to_dict()['paths']['/pets/']['get']
+        param, = [each for each in operation['parameters'] if each['name'] == 'fields']
+        assert param['in'] == 'query'
+        assert param['type'] == 'array'
+        assert param['collectionFormat'] == 'csv'
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+
+import flask
+import pytest
+from marshmallow import fields
+
+from flask_apispec import marshal_with, use_kwargs
+from flask_apispec.extension import FlaskApiSpec
+from flask_apispec.metrics import (
+    PHASE_SECONDS, RESPONSE_BYTES, RESPONSE_ITEMS, Histogram, Registry, request_timed
+)
+from flask_apispec.wrapper import get_runtime
+
+
+@pytest.fixture
+def view(app, models, schemas):
+    @app.route('/bands/<int:band_id>/', methods=['GET', 'POST'])
+    @use_kwargs({'name': fields.Str()}, location='query')
+    @use_kwargs({'genre': fields.Str()}, location='json')
+    @marshal_with(schemas.BandSchema)
+    def get_band(band_id, **kwargs):
+        if band_id == 0:
+            flask.abort(404)
+        return models.Band(kwargs.get('name'), kwargs.get('genre'))
+    return get_band
+
+
+def phases(timings):
+    return [(phase, location) for phase, location, _ in timings]
+
+
+class TestHistogram:
+
+    def test_observe(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(2.65)
+
+
+class TestRegistry:
+
+    def test_to_prometheus(self):
+        registry = Registry(buckets={PHASE_SECONDS: (0.1, 1.0)})
+        registry('get_band', 200, [('view', None, 0.5), ('parse', 'query', 0.05)])
+        assert registry.get(PHASE_SECONDS, endpoint='get_band', status='200',
+                            phase='view').counts == [0, 1, 0]
+        text = registry.to_prometheus()
+        assert '# TYPE flask_apispec_phase_seconds histogram' in text
+        assert (
+            'flask_apispec_phase_seconds_bucket{endpoint="get_band",phase="view",'
+            'status="200",le="1.0"} 1'
+        ) in text
+        assert (
+            'flask_apispec_phase_seconds_count{endpoint="get_band",location="query",'
+            'phase="parse",status="200"} 1'
+        ) in text
+        assert text.count('# HELP') == 1
+
+    def test_escapes_labels(self):
+        registry = Registry()
+        registry('say "hi"', 200, [('view', None, 0.5)])
+        assert 'endpoint="say \\"hi\\""' in registry.to_prometheus()
+
+
+class TestTimings:
+
+    def test_disabled(self, app, client, view):
+        client.get('/bands/1/', {'name': 'queen'})
+        with app.app_context():
+            assert get_runtime().metrics is None
+
+    def test_callback(self, app, client, view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        res = client.post_json('/bands/1/?name=queen', {'genre': 'rock'})
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+        (endpoint, status, timings), = calls
+        assert (endpoint, status) == ('get_band', 200)
+        assert phases(timings) == [
+            ('parse', 'query'), ('parse', 'json'), ('view', None),
+            ('dump', None), ('encode', None), ('total', None),
+        ]
+        assert all(seconds >= 0 for _, _, seconds in timings)
+
+    def test_skipped_locations_not_timed(self, app, client, view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        client.get('/bands/1/')
+        assert ('parse', 'json') not in phases(calls[0][2])
+
+    def test_error_status(self, app, client, view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        client.get('/bands/0/', expect_errors=True)
+        assert calls[0][1] == 404
+        assert phases(calls[0][2])[-1] == ('total', None)
+
+    def test_signal(self, app, client, view):
+        received = []
+
+        def receive(sender, **kwargs):
+            received.append((sender, kwargs))
+
+        app.config['APISPEC_METRICS'] = 'signal'
+        with request_timed.connected_to(receive, app):
+            client.get('/bands/1/')
+        (sender, kwargs), = received
+        assert sender is app
+        assert kwargs['endpoint'] == 'get_band'
+        assert kwargs['status'] == 200
+
+    def test_invalid_config(self, app, client, view):
+        app.config['APISPEC_METRICS'] = 'histograms'
+        with pytest.raises(ValueError):
+            client.get('/bands/1/')
+
+    def test_async_view(self, app, client, models, schemas):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+
+        @app.route('/bands/')
+        @marshal_with(schemas.BandSchema)
+        async def get_band():
+            await asyncio.sleep(0)
+            return models.Band('queen', 'rock')
+
+        client.get('/bands/')
+        assert phases(calls[0][2]) == [
+            ('view', None), ('dump', None), ('encode', None), ('total', None),
+        ]
+
+
+class TestResponseMeasures:
+
+    @pytest.fixture
+    def list_view(self, app, models, schemas):
+        @app.route('/bands/')
+        @use_kwargs({'count': fields.Int()}, location='query')
+        @marshal_with(schemas.BandSchema(many=True))
+        def list_bands(count=2):
+            return [models.Band('queen', 'rock') for _ in range(count)]
+        return list_bands
+
+    def test_measures(self, app, client, list_view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        res = client.get('/bands/', {'count': 3})
+        measures = calls[0][2].response
+        assert measures['schema'] == 'BandSchema'
+        assert measures['items'] == 3
+        assert measures['bytes'] == len(res.body)
+        assert measures['dump_seconds'] >= 0
+
+    def test_single_item(self, app, client, view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        client.get('/bands/1/')
+        assert calls[0][2].response['items'] is None
+
+    def test_unmarshalled(self, app, client):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+
+        @app.route('/bands/')
+        @use_kwargs({'name': fields.Str()}, location='query')
+        def get_band(**kwargs):
+            return 'queen'
+
+        client.get('/bands/')
+        assert calls[0][2].response is None
+
+    def test_registry(self, app, client, list_view):
+        app.config['APISPEC_METRICS'] = True
+        client.get('/bands/', {'count': 20})
+        with app.app_context():
+            registry = get_runtime().metrics
+        labels = {'endpoint': 'list_bands', 'schema': 'BandSchema'}
+        assert registry.get(RESPONSE_ITEMS, **labels).counts[:3] == [0, 0, 1]
+        assert registry.get(RESPONSE_BYTES, **labels).count == 1
+
+    def test_thresholds(self, app, client, list_view, caplog):
+        app.config['APISPEC_WARN_RESPONSE_ITEMS'] = 10
+        app.config['APISPEC_WARN_RESPONSE_BYTES'] = 100000
+        with caplog.at_level(logging.WARNING, logger='flask_apispec.metrics'):
+            client.get('/bands/', {'count': 10})
+            assert not caplog.records
+            client.get('/bands/', {'count': 11})
+        record, = caplog.records
+        assert 'list_bands' in record.getMessage()
+        assert 'BandSchema' in record.getMessage()
+        assert 'items threshold: 11 > 10' in record.getMessage()
+
+
+class TestMetricsEndpoint:
+
+    def test_registry(self, app, client, view):
+        app.config['APISPEC_METRICS'] = True
+        app.config['APISPEC_METRICS_URL'] = '/apispec/metrics'
+        FlaskApiSpec(app)
+        client.get('/bands/1/', {'name': 'queen'})
+        res = client.get('/apispec/metrics')
+        assert res.content_type == 'text/plain'
+        assert 'version=0.0.4' in res.headers['Content-Type']
+        assert (
+            'flask_apispec_phase_seconds_count{endpoint="get_band",location="query",'
+            'phase="parse",status="200"} 1'
+        ) in res.text
+
+    def test_not_found_without_registry(self, app, client):
+        app.config['APISPEC_METRICS'] = 'signal'
+        app.config['APISPEC_METRICS_URL'] = '/apispec/metrics'
+        FlaskApiSpec(app)
+        client.get('/apispec/metrics', status=404)
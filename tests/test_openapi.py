@@ -155,6 +155,29 @@ class TestDeleteView:
         assert response['description'] == 'a deleted band'
         assert response['schema'] == {}
 
+class TestStreamView:
+
+    @pytest.fixture
+    def function_view(self, app, models, schemas):
+        @app.route('/bands/')
+        @marshal_with(schemas.BandSchema(many=True), description='bands', stream='ndjson')
+        def get_bands():
+            return []
+        return get_bands
+
+    @pytest.fixture
+    def path(self, app, spec, function_view):
+        converter = ViewConverter(app=app, spec=spec)
+        paths = converter.convert(function_view)
+        for path in paths:
+            spec.path(**path)
+        return spec._paths['/bands/']
+
+    def test_responses(self, schemas, path, openapi):
+        response = path['get']['responses']['default']
+        assert 'stream' not in response
+        assert response['description'] == 'bands'
+
 class TestResourceView:
 
     @pytest.fixture
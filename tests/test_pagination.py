@@ -0,0 +1,183 @@
+import itertools
+
+import pytest
+from marshmallow import fields
+
+from flask_apispec import (
+    MethodResource, cache_response, marshal_with, paginate, use_kwargs
+)
+from flask_apispec.apidoc import ViewConverter
+from flask_apispec.extension import FlaskApiSpec
+from flask_apispec.pagination import decode_cursor, encode_cursor, get_page
+
+
+class Query:
+    """Sliceable stand-in for a SQLAlchemy query that records its slices."""
+
+    def __init__(self, items):
+        self.items = items
+        self.slices = []
+
+    def __getitem__(self, item):
+        self.slices.append((item.start, item.stop))
+        return self.items[item]
+
+
+@pytest.fixture
+def bands(models):
+    return [models.Band('band {}'.format(index), 'rock') for index in range(25)]
+
+
+@pytest.fixture
+def query(bands):
+    return Query(bands)
+
+
+@pytest.fixture
+def view(app, query, schemas):
+    @app.route('/bands/')
+    @paginate(limit=10, max_limit=20)
+    @use_kwargs({'genre': fields.Str()}, location='query')
+    @marshal_with(schemas.BandSchema(many=True))
+    def list_bands(**kwargs):
+        return query
+    return list_bands
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor(120)) == 120
+
+    @pytest.mark.parametrize('cursor', ['', 'LTE', '!!', 'ä'])
+    def test_invalid(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestGetPage:
+
+    def test_slices_sequences(self, query):
+        page = get_page(query, 20, 10)
+        assert len(page.items) == 5
+        assert page.next_cursor is None
+        assert query.slices == [(20, 31)]
+
+    def test_consumes_iterables_up_to_page(self):
+        items = itertools.count()
+        page = get_page(items, 5, 3)
+        assert page.items == [5, 6, 7]
+        assert decode_cursor(page.next_cursor) == 8
+        assert next(items) == 9
+
+
+class TestPaginate:
+
+    def test_first_page(self, app, client, view, query):
+        res = client.get('/bands/', {'genre': 'rock'})
+        assert [band['name'] for band in res.json['items']] == [
+            'band {}'.format(index) for index in range(10)
+        ]
+        assert decode_cursor(res.json['next']) == 10
+        assert query.slices == [(0, 11)]
+        assert res.headers['Link'] == (
+            '<http://localhost/bands/?genre=rock&cursor={}&limit=10>; rel="next"'
+            .format(res.json['next'])
+        )
+
+    def test_follow_cursors(self, app, client, view):
+        names = []
+        cursor = None
+        while True:
+            params = {'limit': 7} if cursor is None else {'cursor': cursor, 'limit': 7}
+            res = client.get('/bands/', params)
+            names.extend(band['name'] for band in res.json['items'])
+            cursor = res.json['next']
+            if cursor is None:
+                break
+        assert names == ['band {}'.format(index) for index in range(25)]
+        assert 'Link' not in res.headers
+
+    @pytest.mark.parametrize('params', [
+        {'limit': 0}, {'limit': 21}, {'cursor': 'nope'},
+    ])
+    def test_invalid_args(self, app, client, view, params):
+        res = client.get('/bands/', params, expect_errors=True)
+        assert res.status_code == 422
+
+    def test_without_envelope(self, app, client, query, schemas):
+        @app.route('/bands/')
+        @paginate(limit=5, envelope=None)
+        @marshal_with(schemas.BandSchema)
+        def list_bands():
+            return (band for band in query.items)
+
+        res = client.get('/bands/')
+        assert len(res.json) == 5
+        assert 'rel="next"' in res.headers['Link']
+
+    def test_resource(self, app, client, query, schemas):
+        @paginate(limit=3)
+        class BandResource(MethodResource):
+            @marshal_with(schemas.BandSchema(many=True))
+            def get(self):
+                return query
+
+        app.add_url_rule('/bands/', view_func=BandResource.as_view('bands'))
+        res = client.get('/bands/')
+        assert len(res.json['items']) == 3
+
+    def test_cached_per_page(self, app, client, query, schemas):
+        @app.route('/bands/')
+        @cache_response(ttl=60)
+        @paginate(limit=10)
+        @marshal_with(schemas.BandSchema(many=True))
+        def list_bands():
+            return query
+
+        first = client.get('/bands/').json
+        second = client.get('/bands/', {'cursor': first['next']}).json
+        assert first['items'] != second['items']
+        assert client.get('/bands/').json == first
+        assert len(query.slices) == 2
+
+    def test_metrics_count_page_items(self, app, client, view):
+        calls = []
+        app.config['APISPEC_METRICS'] = lambda *args: calls.append(args)
+        client.get('/bands/', {'limit': 4})
+        assert calls[0][2].response['items'] == 4
+
+
+class TestDocs:
+
+    def test_params_and_envelope(self, app, view):
+        docs = FlaskApiSpec(app)
+        docs.register(view)
+        operation = docs.spec.to_dict()['paths']['/bands/']['get']
+        params = {param['name']: param for param in operation['parameters']}
+        assert params['cursor']['in'] == 'query'
+        assert params['limit']['maximum'] == 20
+        assert params['limit']['default'] == 10
+        schema = operation['responses']['default']['schema']
+        assert schema['type'] == 'object'
+        assert schema['properties']['items']['type'] == 'array'
+        assert schema['properties']['next']['type'] == 'string'
+
+    def test_documented_default_accepted(self, app, client, view):
+        docs = FlaskApiSpec(app)
+        docs.register(view)
+        operation = docs.spec.to_dict()['paths']['/bands/']['get']
+        params = {param['name']: param for param in operation['parameters']}
+        res = client.get('/bands/', {'cursor': params['cursor']['default']})
+        assert res.json == client.get('/bands/').json
+
+    def test_unpaginated_views_unchanged(self, app, schemas):
+        @app.route('/bands/')
+        @marshal_with(schemas.BandSchema(many=True))
+        def list_bands():
+            return []
+
+        docs = FlaskApiSpec(app)
+        converter = ViewConverter(app, docs.spec)
+        responses = converter.get_responses(list_bands)
+        assert 'properties' not in str(responses['default']['schema'])
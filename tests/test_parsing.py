@@ -0,0 +1,312 @@
+import marshmallow as ma
+import pytest
+from marshmallow import class_registry, fields
+from webargs import flaskparser
+
+from flask_apispec import MethodResource, Ref, parsing, use_kwargs, utils
+from flask_apispec.parsing import (
+    DictArgs, argument_names, empty_checks, is_optional, merge_args, schema_from_dict
+)
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    locations = []
+    parse = flaskparser.parser.parse
+
+    def counting_parse(schema, **kwargs):
+        locations.append(kwargs['location'])
+        return parse(schema, **kwargs)
+
+    monkeypatch.setattr(flaskparser.parser, 'parse', counting_parse)
+    return locations
+
+
+class TestIsOptional:
+
+    def test_dict(self):
+        assert is_optional({'name': fields.Str()})
+        assert not is_optional({'name': fields.Str(required=True)})
+        assert not is_optional({'name': fields.Str(load_default='queen')})
+
+    def test_schema(self, schemas):
+        assert is_optional(schemas.BandSchema)
+        assert is_optional(schemas.BandSchema(only=('name', )))
+        assert not is_optional(schemas.BandSchema(many=True))
+
+    def test_schema_hooks(self):
+        class HookSchema(ma.Schema):
+            name = fields.Str()
+
+            @ma.post_load
+            def make_band(self, data, **kwargs):
+                return data
+
+        assert not is_optional(HookSchema)
+
+    def test_schema_load_override(self):
+        class TenantSchema(ma.Schema):
+            name = fields.Str()
+
+            def load(self, data, **kwargs):
+                loaded = super().load(data, **kwargs)
+                loaded.setdefault('tenant', 'acme')
+                return loaded
+
+        assert not is_optional(TenantSchema)
+        assert argument_names(TenantSchema) is None
+
+    def test_callable(self, schemas):
+        assert not is_optional(lambda request: schemas.BandSchema())
+
+
+class TestEmptyChecks:
+
+    def test_flask_parser(self):
+        checks = empty_checks(flaskparser.parser)
+        assert {'query', 'json', 'form', 'cookies', 'view_args'} <= set(checks)
+        assert 'headers' not in checks
+
+    def test_custom_loader(self):
+        class CustomParser(flaskparser.FlaskParser):
+            def load_querystring(self, req, schema):
+                return {'name': 'queen'}
+
+        checks = empty_checks(CustomParser())
+        assert 'query' not in checks
+        assert 'json' in checks
+
+    def test_custom_pre_load(self):
+        class CustomParser(flaskparser.FlaskParser):
+            def pre_load(self, location_data, **kwargs):
+                return location_data
+
+        assert empty_checks(CustomParser()) == {}
+
+    def test_custom_schema_class(self):
+        class CustomSchema(ma.Schema):
+            @ma.post_load
+            def add_custom(self, data, **kwargs):
+                return dict(data, custom=True)
+
+        class CustomParser(flaskparser.FlaskParser):
+            DEFAULT_SCHEMA_CLASS = CustomSchema
+
+        assert empty_checks(CustomParser()) == {}
+        assert empty_checks(flaskparser.FlaskParser(schema_class=CustomSchema)) == {}
+
+    def test_other_parser(self):
+        assert empty_checks(object()) == {}
+
+
+class TestMergeArgs:
+
+    def test_merge_same_location(self):
+        name, genre, page = {'name': fields.Str()}, {'genre': fields.Str()}, {
+            'page': fields.Int()}
+        merged = merge_args([(name, 'json'), (page, 'query'), (genre, 'json')])
+        assert merged == [
+            (DictArgs([name, genre]), 'json'),
+            (DictArgs([page]), 'query'),
+        ]
+        assert schema_from_dict(*merged[0][0])().fields.keys() == {'name', 'genre'}
+
+    def test_schemas_unchanged(self, schemas):
+        name = {'name': fields.Str()}
+        args = [(name, 'json'), (schemas.BandSchema, 'json')]
+        assert merge_args(args) == [
+            (DictArgs([name]), 'json'), (schemas.BandSchema, 'json'),
+        ]
+
+    def test_colliding_names_not_merged(self):
+        first, second = {'name': fields.Str()}, {'name': fields.Int()}
+        assert merge_args([(first, 'json'), (second, 'json')]) == [
+            (DictArgs([first]), 'json'), (DictArgs([second]), 'json'),
+        ]
+
+    def test_names_set_in_between_not_merged(self, schemas):
+        name, genre = {'name': fields.Str()}, {'genre': fields.Str()}
+        args = [(name, 'json'), (schemas.BandSchema, 'query'), (genre, 'json')]
+        assert merge_args(args) == [
+            (DictArgs([name]), 'json'),
+            (schemas.BandSchema, 'query'),
+            (DictArgs([genre]), 'json'),
+        ]
+
+    def test_unknown_names_in_between_not_merged(self, schemas):
+        name, genre = {'name': fields.Str()}, {'genre': fields.Str()}
+
+        def callable_schema(request):
+            return schemas.BandSchema()
+
+        args = [(name, 'json'), (callable_schema, 'query'), (genre, 'json')]
+        assert merge_args(args) == [
+            (DictArgs([name]), 'json'),
+            (callable_schema, 'query'),
+            (DictArgs([genre]), 'json'),
+        ]
+
+
+class TestSchemaFromDict:
+
+    def test_cached(self):
+        name, genre = {'name': fields.Str()}, {'genre': fields.Str()}
+        schema = schema_from_dict(name, genre)
+        assert schema is schema_from_dict(name, genre)
+        assert schema is not schema_from_dict(genre, name)
+        assert schema is not schema_from_dict(dict(name, **genre))
+
+    def test_schema_class(self):
+        class CustomSchema(ma.Schema):
+            pass
+
+        name = {'name': fields.Str()}
+        schema = schema_from_dict(name, schema_class=CustomSchema)
+        assert issubclass(schema, CustomSchema)
+        assert schema is schema_from_dict(name, schema_class=CustomSchema)
+        assert schema is not schema_from_dict(name)
+
+    def test_stable_across_requests(self, app, monkeypatch):
+        @app.route('/bands/')
+        @use_kwargs({'name': fields.Str()}, location='query')
+        @use_kwargs({'genre': fields.Str()}, location='json')
+        def view(**kwargs):
+            return kwargs
+
+        generated = []
+        from_dict = ma.Schema.from_dict.__func__
+
+        def counting_from_dict(cls, *args, **kwargs):
+            generated.append(cls)
+            return from_dict(cls, *args, **kwargs)
+
+        monkeypatch.setattr(ma.Schema, 'from_dict', classmethod(counting_from_dict))
+        with app.test_request_context('/bands/?name=queen', json={'genre': 'rock'}):
+            view()
+            registry_size = len(class_registry._registry)
+            for _ in range(10000):
+                assert view().json == {'name': 'queen', 'genre': 'rock'}
+        assert generated == []
+        assert len(class_registry._registry) == registry_size
+
+    def test_per_instance_dicts_not_cached(self, app, client):
+        @use_kwargs(Ref('args', per_instance=True), location='query')
+        class BandResource(MethodResource):
+            def __init__(self):
+                self.args = {'name': fields.Str()}
+
+            def get(self, **kwargs):
+                return kwargs
+
+        app.add_url_rule('/bands/', view_func=BandResource.as_view('bands'))
+        cached = len(parsing._dict_schemas)
+        for _ in range(50):
+            assert client.get('/bands/', {'name': 'queen'}).json == {'name': 'queen'}
+        assert len(parsing._dict_schemas) == cached
+
+    def test_cache_size_limited(self, monkeypatch):
+        monkeypatch.setattr(parsing, '_dict_schemas', {})
+        monkeypatch.setattr(utils, 'SCHEMA_POOL_SIZE', 2)
+        for _ in range(5):
+            schema_from_dict({'name': fields.Str()})
+        assert len(parsing._dict_schemas) == 2
+
+
+class TestMergedParsing:
+
+    @pytest.fixture
+    def view(self, app):
+        @app.route('/bands/', methods=['POST'])
+        @use_kwargs({'name': fields.Str(required=True)}, location='json')
+        @use_kwargs({'page': fields.Int()}, location='query')
+        @use_kwargs({'genre': fields.Str(), 'year': fields.Int()}, location='json')
+        def view(**kwargs):
+            return kwargs
+        return view
+
+    def test_parsed_once(self, app, client, view, parsed):
+        res = client.post_json('/bands/?page=2', {'name': 'queen', 'genre': 'rock'})
+        assert res.json == {'name': 'queen', 'genre': 'rock', 'page': 2}
+        assert sorted(parsed) == ['json', 'query']
+
+    def test_parser_schema_class(self, app, client):
+        class CustomSchema(ma.Schema):
+            @ma.post_load
+            def mark(self, data, **kwargs):
+                return dict(data, custom=True)
+
+        class CustomParser(flaskparser.FlaskParser):
+            DEFAULT_SCHEMA_CLASS = CustomSchema
+
+        app.config['APISPEC_WEBARGS_PARSER'] = CustomParser()
+
+        @app.route('/bands/')
+        @use_kwargs({'name': fields.Str()}, location='query')
+        @use_kwargs({'genre': fields.Str()}, location='query')
+        def view(**kwargs):
+            return kwargs
+
+        res = client.get('/bands/', {'name': 'queen', 'genre': 'rock'})
+        assert res.json == {'name': 'queen', 'genre': 'rock', 'custom': True}
+        assert client.get('/bands/').json == {'custom': True}
+
+    def test_errors(self, app, client, view, parsed):
+        res = client.post_json('/bands/', {'year': 'x'}, expect_errors=True)
+        assert res.status_code == 422
+        assert parsed == ['json']
+
+    def test_method_resource(self, app, client, parsed):
+        @use_kwargs({'genre': fields.Str()}, location='query')
+        class BaseResource(MethodResource):
+            pass
+
+        class BandResource(BaseResource):
+            @use_kwargs({'name': fields.Str()}, location='query')
+            def get(self, **kwargs):
+                return kwargs
+
+        app.add_url_rule('/bands/', view_func=BandResource.as_view('bands'))
+        res = client.get('/bands/', {'name': 'queen', 'genre': 'rock'})
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+        assert parsed == ['query']
+
+
+class TestSkipEmptyLocations:
+
+    @pytest.fixture
+    def view(self, app):
+        @app.route('/bands/', methods=['GET', 'POST'])
+        @use_kwargs({'page': fields.Int()}, location='query')
+        @use_kwargs({'name': fields.Str()}, location='json')
+        @use_kwargs({'session': fields.Str()}, location='cookies')
+        def view(**kwargs):
+            return kwargs
+        return view
+
+    def test_skipped(self, app, client, view, parsed):
+        assert client.get('/bands/').json == {}
+        assert parsed == []
+
+    def test_parsed(self, app, client, view, parsed):
+        res = client.post_json('/bands/?page=2', {'name': 'queen'})
+        assert res.json == {'page': 2, 'name': 'queen'}
+        assert sorted(parsed) == ['json', 'query']
+
+    def test_required_parsed(self, app, client, parsed):
+        @app.route('/bands/')
+        @use_kwargs({'name': fields.Str(required=True)}, location='json')
+        def view(**kwargs):
+            return kwargs
+
+        res = client.get('/bands/', expect_errors=True)
+        assert res.status_code == 422
+        assert parsed == ['json']
+
+    def test_default_parsed(self, app, client, parsed):
+        @app.route('/bands/')
+        @use_kwargs({'page': fields.Int(load_default=1)}, location='query')
+        def view(**kwargs):
+            return kwargs
+
+        assert client.get('/bands/').json == {'page': 1}
+        assert parsed == ['query']
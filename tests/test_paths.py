@@ -1,4 +1,10 @@
-from flask_apispec.paths import rule_to_path, rule_to_params
+import pytest
+import werkzeug.routing
+
+from flask_apispec import paths
+from flask_apispec.paths import (
+    CONVERTER_MAPPING, RouteIndex, register_converter, rule_to_params, rule_to_path
+)
 
 def make_rule(app, path, **kwargs):
     @app.route(path, **kwargs)
@@ -62,3 +68,79 @@ class TestPathParams:
         expected = make_param(type='string', name='Authorization', in_location='header', description='The authorization token',
                               required=True)
         assert params[0] == expected
+
+class TestConverters:
+
+    @pytest.fixture
+    def converter(self, app):
+        class HexConverter(werkzeug.routing.BaseConverter):
+            regex = '[0-9a-f]+'
+        app.url_map.converters['hex'] = HexConverter
+        yield HexConverter
+        CONVERTER_MAPPING.pop(HexConverter, None)
+
+    def test_unregistered(self, app, converter):
+        rule = make_rule(app, '/<hex:band_id>/')
+        assert rule_to_params(rule)[0] == make_param(type='string', name='band_id')
+
+    def test_registered(self, app, converter):
+        register_converter(converter, 'string', 'hex')
+        rule = make_rule(app, '/<hex:band_id>/')
+        expected = make_param(type='string', format='hex', name='band_id')
+        assert rule_to_params(rule)[0] == expected
+
+    def test_subclass(self, app):
+        class EvenConverter(werkzeug.routing.IntegerConverter):
+            pass
+        app.url_map.converters['even'] = EvenConverter
+        rule = make_rule(app, '/<even:band_id>/')
+        expected = make_param(type='integer', format='int32', name='band_id')
+        assert rule_to_params(rule)[0] == expected
+
+
+class TestRouteIndex:
+
+    def test_matches_rule_functions(self, app):
+        rule = make_rule(app, '/bands/<int:band_id>/', defaults={'band_id': 1})
+        index = RouteIndex(app.url_map)
+        overrides = {
+            'band_id': {'description': 'the band id'},
+            'Authorization': {'type': 'string', 'in': 'header'},
+        }
+        assert index.rules('view') == [rule]
+        assert index.path(rule) == rule_to_path(rule)
+        assert index.params(rule, overrides) == rule_to_params(rule, overrides)
+
+    def test_params_not_shared(self, app):
+        rule = make_rule(app, '/<band_id>/')
+        index = RouteIndex(app.url_map)
+        index.params(rule)[0]['description'] = 'changed'
+        assert 'description' not in index.params(rule)[0]
+
+    def test_computed_once(self, app, monkeypatch):
+        rule = make_rule(app, '/<band_id>/')
+        index = RouteIndex(app.url_map)
+        index.params(rule)
+        monkeypatch.setattr(paths, 'rule_to_path', None)
+        monkeypatch.setattr(paths, 'argument_to_param', None)
+        assert index.path(rule) == '/{band_id}/'
+        assert index.params(rule)[0]['name'] == 'band_id'
+
+    def test_new_rules(self, app):
+        index = RouteIndex(app.url_map)
+        app.add_url_rule('/bands/', 'bands', lambda: None)
+        rule, = index.rules('bands')
+        assert index.path(rule) == '/bands/'
+
+    def test_register_converter_invalidates(self, app):
+        class HexConverter(werkzeug.routing.BaseConverter):
+            pass
+        app.url_map.converters['hex'] = HexConverter
+        rule = make_rule(app, '/<hex:band_id>/')
+        index = RouteIndex(app.url_map)
+        assert 'format' not in index.params(rule)[0]
+        try:
+            register_converter(HexConverter, 'string', 'hex')
+            assert index.params(rule)[0]['format'] == 'hex'
+        finally:
+            CONVERTER_MAPPING.pop(HexConverter)
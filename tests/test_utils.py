@@ -1,3 +1,8 @@
+import concurrent.futures
+
+import marshmallow as ma
+import pytest
+
 from flask_apispec import utils
 
 class TestAnnotations:
@@ -8,3 +13,155 @@ class TestAnnotations:
     def test_not_equals(self):
         assert utils.Annotation() != 7
         assert utils.Annotation() != utils.Annotation({'foo': 'bar'})
+
+    def test_hash(self):
+        first = utils.Annotation([{'tags': ['band']}, {'args': {'name': 1}}])
+        second = utils.Annotation([{'tags': ['band']}, {'args': {'name': 1}}])
+        assert first == second
+        assert hash(first) == hash(second)
+        assert len({first, second}) == 1
+        assert hash(first) != hash(utils.Annotation([{'tags': ['album']}]))
+
+    def test_hash_unhashable_leaf(self):
+        first = utils.Annotation([{'buffer': bytearray(b'a')}])
+        assert first == utils.Annotation([{'buffer': bytearray(b'a')}])
+        assert first != utils.Annotation([{'buffer': bytearray(b'b')}])
+        assert len({first, utils.Annotation([{'buffer': bytearray(b'b')}])}) == 2
+
+    def test_immutable(self):
+        annotation = utils.Annotation([{'tags': ['band']}])
+        assert annotation.options == ({'tags': ['band']}, )
+        with pytest.raises(AttributeError):
+            annotation.options = ()
+        with pytest.raises(AttributeError):
+            annotation.extra = True
+
+    def test_merge(self):
+        first = utils.Annotation([{'tags': ['band']}], apply=True)
+        second = utils.Annotation([{'tags': ['album']}], inherit=False)
+        merged = first.merge(second)
+        assert merged.options == first.options + second.options
+        assert merged.inherit is False
+        assert merged.apply is True
+        assert second.merge(first) is second
+
+    def test_refs(self):
+        ref = utils.Ref('schema')
+        annotation = utils.Annotation([
+            {'docs': {'tags': ['band']}},
+            {'args': {'name': ref}, 'kwargs': {'location': 'json'}},
+            {'schemas': [1, ref]},
+        ])
+        assert annotation.refs == ((1, 'args', 'name'), (2, 'schemas', 1))
+        assert utils.Annotation([{'tags': ['band']}]).refs == ()
+
+    def test_resolve_without_refs(self):
+        annotation = utils.Annotation([{'tags': ['band']}])
+        assert annotation.resolve(object()) is annotation
+
+    def test_resolve_refs(self):
+        class Resource:
+            schema = 'band'
+
+        docs = {'tags': ['band']}
+        annotation = utils.Annotation([
+            {'docs': docs, 'schema': utils.Ref('schema')},
+            {'schemas': [utils.Ref('schema'), utils.Ref('missing')]},
+        ])
+        resolved = annotation.resolve(Resource())
+        assert resolved.options == (
+            {'docs': docs, 'schema': 'band'},
+            {'schemas': ['band', None]},
+        )
+        assert resolved.options[0]['docs'] is docs
+        assert resolved.refs == ()
+        assert isinstance(annotation.options[0]['schema'], utils.Ref)
+
+    def test_per_instance(self):
+        shared = utils.Annotation([{'schema': utils.Ref('schema')}])
+        own = utils.Annotation([{'schema': utils.Ref('schema', per_instance=True)}])
+        assert not shared.per_instance
+        assert own.per_instance
+        assert shared.merge(own).per_instance
+
+    def test_merge_refs(self):
+        ref = utils.Ref('schema')
+        first = utils.Annotation([{'a': 1}, {'schema': ref}])
+        second = utils.Annotation([{'schema': ref}])
+        assert first.merge(second).refs == ((1, 'schema'), (2, 'schema'))
+        assert second.merge(first).refs == ((0, 'schema'), (2, 'schema'))
+
+class TestSchemaPool:
+
+    def test_resolve_schema_pooled(self, schemas):
+        schema = utils.resolve_schema(schemas.BandSchema)
+        assert isinstance(schema, schemas.BandSchema)
+        assert utils.resolve_schema(schemas.BandSchema) is schema
+
+    def test_pooled_schema_kwargs(self, schemas):
+        schema = utils.pooled_schema(schemas.BandSchema, only=('name', ))
+        assert schema is utils.pooled_schema(schemas.BandSchema, only=['name'])
+        assert schema is not utils.pooled_schema(schemas.BandSchema)
+        assert schema is not utils.pooled_schema(schemas.BandSchema, many=True)
+        assert schema.dump({'name': 'queen', 'genre': 'rock'}) == {'name': 'queen'}
+
+    def test_pooled_schema_opt_out(self):
+        class ContextSchema(ma.Schema):
+            name = ma.fields.Str()
+
+            class Meta:
+                apispec_pool = False
+
+        assert utils.pooled_schema(ContextSchema) is not utils.pooled_schema(ContextSchema)
+
+    def test_pooled_schema_unhashable(self, schemas):
+        context = {'buffer': bytearray()}
+        schema = utils.pooled_schema(schemas.BandSchema, context={'tags': ['rock']})
+        assert schema is utils.pooled_schema(schemas.BandSchema, context={'tags': ['rock']})
+        assert utils.pooled_schema(schemas.BandSchema, context={'obj': context}) is not \
+            utils.pooled_schema(schemas.BandSchema, context={'obj': context})
+
+    def test_pooled_schema_threads(self, schemas):
+        def dump(name):
+            schema = utils.resolve_schema(schemas.BandSchema)
+            return schema.dump({'name': name, 'genre': 'rock'})['name']
+
+        names = [str(idx) for idx in range(200)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(dump, names)) == names
+
+class TestMergeRecursive:
+
+    def test_child_wins(self):
+        child = {'tags': ['child'], 'params': {'id': {'description': 'child'}}}
+        parent = {
+            'tags': ['parent'],
+            'description': 'parent',
+            'params': {'id': {'in': 'path'}, 'name': {'in': 'query'}},
+        }
+        assert utils.merge_recursive([child, parent]) == {
+            'tags': ['child'],
+            'description': 'parent',
+            'params': {
+                'id': {'description': 'child', 'in': 'path'},
+                'name': {'in': 'query'},
+            },
+        }
+
+    def test_none_values(self):
+        assert utils.merge_recursive([{'a': None}, {'a': 1, 'b': None}]) == {'a': 1, 'b': None}
+        assert utils.merge_recursive([]) == {}
+
+    def test_shares_unchanged_subtrees(self):
+        child = {'params': {'id': {'in': 'path'}}}
+        parent = {'responses': {'200': {'description': 'ok'}}}
+        merged = utils.merge_recursive([child, parent])
+        assert merged['params'] is child['params']
+        assert merged['responses'] is parent['responses']
+        assert child == {'params': {'id': {'in': 'path'}}}
+
+    def test_memoized(self):
+        values = [{'a': {'b': 1}}, {'a': {'c': 2}}]
+        assert utils.merge_recursive(values) is utils.merge_recursive(values)
+        copies = [dict(each) for each in values]
+        assert utils.merge_recursive(values) is not utils.merge_recursive(copies)
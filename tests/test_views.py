@@ -1,10 +1,13 @@
+import asyncio
 import json
 
+import pytest
 from flask import make_response
 from marshmallow import fields, Schema, post_load, EXCLUDE
 
 from flask_apispec.utils import Ref
 from flask_apispec.views import MethodResource
+from flask_apispec.wrapper import AsyncWrapper, get_plan, get_wrapper, reload_runtime
 from flask_apispec import doc, use_kwargs, marshal_with
 
 
@@ -180,6 +183,48 @@ class TestFunctionViews:
         res = client.get('/')
         assert res.json == {'name': 'queen'}
 
+    def test_marshal_with_stream(self, app, client, models, schemas):
+        app.config['APISPEC_STREAM_CHUNK_SIZE'] = 2
+
+        @app.route('/')
+        @marshal_with(schemas.BandSchema(many=True), stream=True)
+        def view():
+            return (models.Band('band {}'.format(idx), 'rock') for idx in range(5))
+        res = client.get('/')
+        assert res.content_type == 'application/json'
+        assert res.json == [
+            {'name': 'band {}'.format(idx), 'genre': 'rock'} for idx in range(5)
+        ]
+
+    def test_marshal_with_stream_empty(self, app, client, schemas):
+        @app.route('/')
+        @marshal_with(schemas.BandSchema, stream=True)
+        def view():
+            return iter([])
+        assert client.get('/').json == []
+
+    def test_marshal_with_stream_ndjson(self, app, client, models, schemas):
+        @app.route('/')
+        @marshal_with(schemas.BandSchema(only=('name', )), code=201, stream='ndjson')
+        def view():
+            bands = [models.Band('queen', 'rock'), models.Band('slowdive', 'shoegaze')]
+            return bands, 201
+        res = client.get('/')
+        assert res.status_code == 201
+        assert res.content_type == 'application/x-ndjson'
+        assert res.text == '{"name":"queen"}\n{"name":"slowdive"}\n'
+
+    def test_marshal_with_stream_format_response(self, app, client, models, schemas):
+        app.config['APISPEC_FORMAT_RESPONSE'] = lambda data: {'data': data}
+
+        @app.route('/')
+        @marshal_with(schemas.BandSchema(many=True), stream=True)
+        def view():
+            return (models.Band('band {}'.format(idx), 'rock') for idx in range(2))
+        assert client.get('/').json == {'data': [
+            {'name': 'band 0', 'genre': 'rock'}, {'name': 'band 1', 'genre': 'rock'},
+        ]}
+
     def test_integration(self, app, client, models, schemas):
         @app.route('/')
         @use_kwargs(
@@ -215,6 +260,18 @@ class TestClassViews:
         assert BaseResource.get.__apispec__['docs'][0].options[0]['description'] == 'parent'
         assert ChildResource.get.__apispec__['docs'][0].options[0]['description'] == 'child'
 
+    def test_inheritance_deep_deduplicated(self):
+        base = MethodResource
+        for level in range(10):
+            base = doc(tags=['level {}'.format(level)])(
+                type(base)('Level{}'.format(level), (base, ), {}))
+
+        tags = [
+            annotation.options[0]['tags'][0]
+            for annotation in base.__apispec__['docs']
+        ]
+        assert tags == ['level {}'.format(level) for level in reversed(range(10))]
+
     def test_inheritance_only_http_methods(self, app):
         @use_kwargs({'genre': fields.Str()})
         class ConcreteResource(MethodResource):
@@ -377,3 +434,159 @@ class TestClassViews:
         app.add_url_rule('/<id>/', view_func=ConcreteResource.as_view('concrete'))
         res = client.delete('/5/')
         assert res.body == b''
+
+class TestViewPlans:
+
+    def test_plan_cached(self, app, client):
+        @app.route('/')
+        @use_kwargs({'name': fields.Str()}, location='querystring')
+        def view(**kwargs):
+            return kwargs
+        client.get('/', {'name': 'freddie'})
+        plan = get_plan(view)
+        client.get('/', {'name': 'freddie'})
+        assert get_plan(view) is plan
+
+    def test_plan_invalidated(self, app, client, models, schemas):
+        @marshal_with(schemas.BandSchema)
+        def view(name=None):
+            return models.Band(name, 'rock')
+        app.add_url_rule('/', view_func=view)
+        res = client.get('/', {'name': 'queen'})
+        assert res.json == {'name': None, 'genre': 'rock'}
+        use_kwargs({'name': fields.Str()}, location='querystring')(view)
+        res = client.get('/', {'name': 'queen'})
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+
+    def test_plan_per_resource_class(self, app, client, models, schemas):
+        class BaseResource(MethodResource):
+            @marshal_with(schemas.BandSchema(only=('name', )))
+            def get(self, **kwargs):
+                return models.Band('slowdive', 'shoegaze')
+
+        @marshal_with(schemas.BandSchema(only=('genre', )))
+        class ConcreteResource(BaseResource):
+            pass
+
+        app.add_url_rule('/base/', view_func=BaseResource.as_view('base'))
+        app.add_url_rule('/concrete/', view_func=ConcreteResource.as_view('concrete'))
+        assert client.get('/base/').json == {'name': 'slowdive'}
+        assert client.get('/concrete/').json == {'name': 'slowdive'}
+        assert get_plan(BaseResource.get, BaseResource()).cacheable
+
+    def test_plan_with_refs_cached_per_class(self, app, client, models, schemas):
+        class BaseResource(MethodResource):
+            schema = schemas.BandSchema
+
+            @marshal_with(Ref('schema'))
+            def get(self, **kwargs):
+                return models.Band('slowdive', 'shoegaze')
+
+        class GenreResource(BaseResource):
+            schema = schemas.BandSchema(only=('genre', ))
+
+        class NameResource(GenreResource):
+            schema = schemas.BandSchema(only=('name', ))
+
+        app.add_url_rule('/base/', view_func=BaseResource.as_view('base'))
+        app.add_url_rule('/genre/', view_func=GenreResource.as_view('genre'))
+        app.add_url_rule('/name/', view_func=NameResource.as_view('name'))
+        for _ in range(2):
+            assert client.get('/base/').json == {'name': 'slowdive', 'genre': 'shoegaze'}
+            assert client.get('/genre/').json == {'genre': 'shoegaze'}
+            assert client.get('/name/').json == {'name': 'slowdive'}
+
+        plan = get_plan(BaseResource.get, GenreResource())
+        assert plan.cacheable
+        assert plan is get_plan(BaseResource.get, GenreResource())
+        assert plan is not get_plan(BaseResource.get, NameResource())
+        assert plan.schemas['default']['schema'] is GenreResource.schema
+
+    def test_plan_with_per_instance_refs_not_cached(self, app, client, models, schemas):
+        class ConcreteResource(MethodResource):
+            def __init__(self, schema):
+                self.schema = schema
+
+            @marshal_with(Ref('schema', per_instance=True))
+            def get(self, **kwargs):
+                return models.Band('slowdive', 'shoegaze')
+
+        app.add_url_rule('/', view_func=ConcreteResource.as_view(
+            'concrete', schemas.BandSchema(only=('genre', ))))
+        assert client.get('/').json == {'genre': 'shoegaze'}
+        assert not get_plan(ConcreteResource.get, ConcreteResource(None)).cacheable
+
+class TestAsyncViews:
+
+    @pytest.fixture(autouse=True)
+    def asgiref(self):
+        pytest.importorskip('asgiref')
+
+    def test_async_function_view(self, app, client, models, schemas):
+        @app.route('/')
+        @use_kwargs({'name': fields.Str()}, location='querystring')
+        @marshal_with(schemas.BandSchema)
+        async def view(**kwargs):
+            await asyncio.sleep(0)
+            return models.Band(kwargs['name'], 'rock'), 201
+        res = client.get('/', {'name': 'queen'})
+        assert res.status_code == 201
+        assert res.json == {'name': 'queen', 'genre': 'rock'}
+        assert get_plan(view).wrapper_cls is AsyncWrapper
+
+    def test_async_method_resource(self, app, client, models, schemas):
+        @marshal_with(schemas.BandSchema)
+        class BaseResource(MethodResource):
+            async def get(self, **kwargs):
+                pass
+
+        class ConcreteResource(BaseResource):
+            @use_kwargs({'name': fields.Str()}, location='querystring')
+            async def get(self, **kwargs):
+                await asyncio.sleep(0)
+                return models.Band(kwargs['name'], 'shoegaze')
+
+        app.add_url_rule('/', view_func=ConcreteResource.as_view('concrete'))
+        res = client.get('/', {'name': 'slowdive'})
+        assert res.json == {'name': 'slowdive', 'genre': 'shoegaze'}
+
+    def test_async_view_response(self, app, client):
+        @app.route('/')
+        @use_kwargs({'name': fields.Str()}, location='querystring')
+        async def view(**kwargs):
+            return make_response(kwargs['name'], 202)
+        res = client.get('/', {'name': 'queen'})
+        assert res.status_code == 202
+        assert res.body == b'queen'
+
+class TestRuntime:
+
+    def test_wrapper_reused(self, app, client):
+        @app.route('/')
+        @use_kwargs({'name': fields.Str()}, location='querystring')
+        def view(**kwargs):
+            return kwargs
+        client.get('/', {'name': 'freddie'})
+        assert get_wrapper(view) is get_wrapper(view)
+
+    def test_runtime_reload(self, app, client):
+        @app.route('/')
+        @use_kwargs({'name': fields.Str()}, location='querystring')
+        def view(**kwargs):
+            return kwargs
+        assert client.get('/', {'name': 'freddie'}).json == {'name': 'freddie'}
+
+        app.config['APISPEC_FORMAT_RESPONSE'] = lambda data: make_response(data['name'])
+        assert client.get('/', {'name': 'freddie'}).json == {'name': 'freddie'}
+        reload_runtime(app)
+        assert client.get('/', {'name': 'freddie'}).body == b'freddie'
+
+    def test_response_status_and_headers(self, app, client):
+        @app.route('/')
+        @doc(description='a band')
+        def view():
+            return {'name': 'queen'}, '202 ACCEPTED', [('x-msg', 'test')]
+        res = client.get('/')
+        assert res.status == '202 ACCEPTED'
+        assert res.headers['x-msg'] == 'test'
+        assert res.json == {'name': 'queen'}